@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 Mathias Huyghe.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+# Precision and throughput of the Integration accumulators ('float32', 'float64',
+# 'kahan') on a long integration fed in scheduler-sized work calls.
+#
+
+import time
+from argparse import ArgumentParser
+
+import numpy as np
+from gnuradio.radio_telescope_ENAC import Integration
+
+
+def run(accumulator, frames, nb_integration, chunk):
+    """ Integrates the frames and returns the averages and the elapsed time. """
+    vec_len = frames.shape[1]
+    block = Integration(vec_len, nb_integration, 0, 0, 1, "mean", 8, 3.0, False, accumulator)
+    out = np.zeros((len(frames) // nb_integration + 1, vec_len), dtype=np.float32)
+    produced = 0
+    start = time.perf_counter()
+    for first in range(0, len(frames), chunk):
+        produced += block.general_work([frames[first:first + chunk]], [out[produced:]])
+    return out[:produced], time.perf_counter() - start
+
+
+def main():
+    parser = ArgumentParser(description="Integration accumulator benchmark")
+    parser.add_argument("--vec-len", type=int, default=4096)
+    parser.add_argument("--nb-integration", type=int, default=5000)
+    parser.add_argument("--nb-outputs", type=int, default=2)
+    parser.add_argument("--chunk", type=int, default=64, help="Input vectors per work call")
+    args = parser.parse_args()
+
+    # Noise-like power spectra on a large common level, the worst case for float32 sums
+    rng = np.random.default_rng(0)
+    frames = (1e6 * (1 + 0.01 * rng.standard_normal((args.nb_outputs * args.nb_integration, args.vec_len))))
+    frames = frames.astype(np.float32)
+    exact = frames.astype(np.float64).reshape(args.nb_outputs, args.nb_integration, -1).mean(axis=1)
+    # Rounding of the exact result to float32, the best any accumulator can do
+    floor = np.max(np.abs(exact.astype(np.float32) - exact) / exact)
+
+    print(f"{args.nb_outputs} x {args.nb_integration} vectors of {args.vec_len} channels, "
+          f"{args.chunk} vectors per call, float32 output rounding {floor:.2e}")
+    print(f"{'accumulator':<12}{'max rel. error':>16}{'vectors/s':>14}")
+    for accumulator in ("float32", "float64", "kahan"):
+        averages, elapsed = run(accumulator, frames, args.nb_integration, args.chunk)
+        error = np.max(np.abs(averages - exact) / exact)
+        print(f"{accumulator:<12}{error:>16.2e}{len(frames) / elapsed:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 Mathias Huyghe.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import numpy as np
+from gnuradio import gr
+from scipy.interpolate import BSpline
+
+METHODS = ("polynomial", "spline")
+
+
+def line_free_channels(vec_len, line_free):
+    """
+    Indices of the line-free channels.
+
+    Args:
+        vec_len (int): Number of channels.
+        line_free (list): (first, last) channel ranges, last excluded.
+
+    Returns:
+        np.ndarray: Sorted channel indices.
+    """
+    mask = np.zeros(vec_len, dtype=bool)
+    for first, last in line_free:
+        if not 0 <= first < last <= vec_len:
+            raise ValueError(f"Invalid line-free range ({first}, {last}) for {vec_len} channels")
+        mask[first:last] = True
+    return np.flatnonzero(mask)
+
+
+def basis(vec_len, method="polynomial", order=3, nb_knots=8):
+    """
+    Baseline basis functions sampled on the channel axis, mapped to [-1, 1].
+
+    Args:
+        vec_len (int): Number of channels.
+        method (str): 'polynomial' (Legendre polynomials up to order) or 'spline'
+            (B-splines of degree order with nb_knots evenly spaced interior knots).
+        order (int): Polynomial order or spline degree.
+        nb_knots (int): Number of interior knots of the spline.
+
+    Returns:
+        np.ndarray: Basis, shape (vec_len, number of functions).
+    """
+    x = np.linspace(-1.0, 1.0, vec_len)
+    if method == "polynomial":
+        # Legendre rather than monomials: well conditioned on [-1, 1]
+        return np.polynomial.legendre.legvander(x, order)
+    if method == "spline":
+        interior = np.linspace(-1.0, 1.0, nb_knots + 2)[1:-1]
+        knots = np.concatenate(([-1.0] * (order + 1), interior, [1.0] * (order + 1)))
+        return BSpline.design_matrix(x, knots, order).toarray()
+    raise ValueError(f"Invalid baseline method: {method}")
+
+
+def projection(basis_functions, channels, smoothing=0.0):
+    """
+    Least-squares fit of the basis to the given channels, as a matrix.
+
+    With a smoothing factor, the second differences of the coefficients are
+    penalized (P-spline), which turns the B-spline fit into a smoothing spline.
+
+    Args:
+        basis_functions (np.ndarray): Basis, shape (vec_len, P).
+        channels (np.ndarray): Fitted (line-free) channels, length M.
+        smoothing (float): Roughness penalty, 0 for a plain least-squares fit.
+
+    Returns:
+        np.ndarray: Matrix of shape (P, M) giving the coefficients from the fitted channels.
+    """
+    fitted = basis_functions[channels]
+    if smoothing <= 0:
+        return np.linalg.pinv(fitted)
+    size = basis_functions.shape[1]
+    difference = np.diff(np.eye(size), n=2, axis=0)
+    return np.linalg.solve(fitted.T @ fitted + smoothing * difference.T @ difference, fitted.T)
+
+
+class Baseline(gr.sync_block):
+    """
+    Baseline subtraction block.
+    Fits a low-order polynomial or a smoothing spline to the line-free channels of
+    every input spectrum and outputs the spectrum minus the fitted baseline.
+    The channel axis is fixed, so the least-squares projection is computed once;
+    each spectrum then costs two small matrix products (line-free channels to
+    coefficients, coefficients to baseline), batched over the whole buffer.
+    """
+
+    def __init__(self, vec_len, line_free, method="polynomial", order=3, nb_knots=8, smoothing=0.0):
+        """
+        Initializes the Baseline block.
+
+        Args:
+            vec_len (int): Length of input and output vectors.
+            line_free (list): Line-free (first, last) channel ranges, last excluded.
+            method (str): Baseline model ('polynomial', 'spline').
+            order (int): Polynomial order or spline degree.
+            nb_knots (int): Number of interior knots of the spline.
+            smoothing (float): Roughness penalty of the spline, 0 for a least-squares spline.
+        """
+        gr.sync_block.__init__(self,
+                               name="Baseline",  # Name of the block
+                               in_sig=[(np.float32, vec_len)],  # Input: vector of float32
+                               out_sig=[(np.float32, vec_len)])  # Output: baseline-subtracted vector
+
+        self.vec_len = vec_len
+        self.method = method
+        self.order = order
+        self.nb_knots = nb_knots
+        self.smoothing = smoothing
+        self.set_line_free(line_free)
+
+    def set_line_free(self, line_free):
+        """
+        Updates the line-free channel ranges and recomputes the projection.
+
+        Args:
+            line_free (list): Line-free (first, last) channel ranges, last excluded.
+        """
+        channels = line_free_channels(self.vec_len, line_free)
+        basis_functions = basis(self.vec_len, self.method, self.order, self.nb_knots)
+        if len(channels) < basis_functions.shape[1]:
+            raise ValueError(f"{len(channels)} line-free channels cannot fit {basis_functions.shape[1]} parameters")
+        # B-splines lying entirely in a gap are not constrained by any channel: without a
+        # smoothing penalty their coefficients would be zeroed and the baseline would drop there
+        if self.smoothing <= 0 and np.linalg.matrix_rank(basis_functions[channels]) < basis_functions.shape[1]:
+            raise ValueError(f"The line-free channels {line_free} do not constrain every {self.method} parameter, "
+                             "use fewer knots, narrower gaps or a smoothing penalty")
+        # Transposed for row-major batches: coefficients = spectra[:, channels] @ fit
+        fit = projection(basis_functions, channels, self.smoothing).T.astype(np.float32)
+        evaluate = basis_functions.T.astype(np.float32)
+        self.line_free = line_free
+        # Single attribute read once per work() call: a GRC callback cannot mix line-free sets
+        self.model = (channels, fit, evaluate)
+
+    def baseline(self, spectra):
+        """
+        Fitted baselines of a batch of spectra.
+
+        Args:
+            spectra (np.ndarray): Spectra, shape (N, vec_len).
+
+        Returns:
+            np.ndarray: Baselines, shape (N, vec_len).
+        """
+        channels, fit, evaluate = self.model
+        return (spectra[:, channels] @ fit) @ evaluate
+
+    def work(self, input_items, output_items):
+        """
+        Subtracts the fitted baseline from every input vector.
+
+        Args:
+            input_items (list): List of input arrays. Shape: (N, vec_len).
+            output_items (list): List of output arrays. Shape: (N, vec_len).
+
+        Returns:
+            int: Number of output vectors.
+        """
+        in0 = input_items[0]
+        out = output_items[0]
+        np.subtract(in0, self.baseline(in0), out=out)
+        return len(out)
@@ -7,38 +7,88 @@
 #
 
 import numpy as np
+import pmt
 from gnuradio import gr
 
+from . import despike, kurtosis
+from .calibration_store import CalibrationStore
+
+KB = 1.380649e-23  # Boltzmann constant
+CALIBRATION_TYPES = ('Hot', 'Cold', 'Calibrated', 'Non_calibrated', 'Position_switching', 'Frequency_switching')
+SWITCHED_TYPES = ('Position_switching', 'Frequency_switching')
+
+
 class Calibration(gr.sync_block):
     """
     GNURadio block for signal calibration.
-    Supports multiple calibration modes: 'Hot', 'Cold', 'Calibrated', and 'Non_calibrated'.
+    Supports multiple calibration modes: 'Hot', 'Cold', 'Calibrated', 'Non_calibrated',
+    'Position_switching' and 'Frequency_switching'.
+    With a spectral kurtosis threshold, a second input takes the spectral kurtosis
+    from Integration and the channels flagged as RFI keep their previous hot/cold
+    reference.
+    With a store directory, every completed hot/cold solution is saved there and
+    the most recent one for the same vec_len and sample rate is loaded at startup.
+
+    Hot and cold spectra are averaged over calibration_window vectors with running
+    sums; the Y-factor solution is only recomputed when a window closes.
+
+    The calibrated output is an affine transform (scale, offset) of the input,
+    cached with the gain in dB until the solution changes. Each new solution is
+    also published once on the 'solution' message port (Tsys and Gsys in dB).
+
+    In the switched modes, each vector is a "signal" or a "reference" vector, as set
+    by the last 'switch' stream tag or message (True for signal). Running sums of
+    both states give, for every vector, (sig - ref) / ref from the averages so far.
+    In 'Frequency_switching' mode the reference is the signal band shifted by
+    switch_channels channels, and the negative image of the line is folded back
+    onto the positive one. The switch_channels edge channels that have no image
+    in the band are output as NaN.
     """
 
-    def __init__(self, calibration_type, vec_len, sample_rate):
+    def __init__(self, calibration_type, vec_len, sample_rate, sk_threshold=0, spike_threshold=1.2,
+                 reference_band=None, spike_window=21, store_directory="", calibration_window=1,
+                 switch_channels=0):
         """
         Initializes the block with calibration parameters.
 
         Args:
-            calibration_type (str): Type of calibration ('Hot', 'Cold', 'Calibrated', 'Non_calibrated').
+            calibration_type (str): Type of calibration ('Hot', 'Cold', 'Calibrated', 'Non_calibrated',
+                'Position_switching', 'Frequency_switching').
             vec_len (int): Length of input/output vectors.
             sample_rate (float): Sampling rate of the signal.
+            sk_threshold (float): Tolerance |SK - 1| of the RFI mask, 0 to disable the second input.
+            spike_threshold (float): Spike threshold relative to the mean of the reference band, 0 to disable.
+            reference_band (tuple): (first, last) channels of the reference band, None for the
+                default band scaled to vec_len.
+            spike_window (int): Length, in channels, of the running median replacing the spikes.
+            store_directory (str): Directory of the saved calibration solutions, empty to disable.
+            calibration_window (int): Number of vectors averaged per hot/cold measurement.
+            switch_channels (int): Frequency switching offset of the reference, in channels.
         """
+        in_sig = [(np.float32, vec_len)]  # Input: vector of float32
+        if sk_threshold > 0:
+            in_sig.append((np.float32, vec_len))  # Spectral kurtosis used as RFI mask
         gr.sync_block.__init__(self,
                                name="Calibration",  # Block name
-                               in_sig=[(np.float32, vec_len)],  # Input: vector of float32
+                               in_sig=in_sig,
                                out_sig=[(np.float32, vec_len),  # First output port
                                         (np.float32, vec_len),  # Second output port
                                         (np.float32, vec_len)])  # Three outputs: vectors of float32
 
         # Validate that the calibration type is supported
-        assert calibration_type in ['Hot', 'Cold', 'Calibrated', 'Non_calibrated'], \
+        assert calibration_type in CALIBRATION_TYPES, \
             f"Invalid calibration type: {calibration_type}"
 
         # Initialize class attributes
         self.calibration_type = calibration_type
         self.vec_len = vec_len
         self.sample_rate = sample_rate
+        self.sk_threshold = sk_threshold
+
+        # Spike smoothing parameters
+        self.spike_threshold = spike_threshold
+        self.reference = despike.reference_channels(vec_len, reference_band)
+        self.spike_window = spike_window
 
         # Calibration parameters
         self.Tsys = np.zeros(vec_len)  # System temperature (Kelvin)
@@ -52,18 +102,118 @@ class Calibration(gr.sync_block):
         self.freq = np.fft.fftfreq(vec_len, 1 / self.sample_rate)  # Frequency axis
         self.freq += 1420e6  # Shift frequencies by 1.42 GHz
 
+        # Running sums of the hot/cold window: per-channel sum and number of unflagged vectors
+        self.calibration_window = max(1, calibration_window)
+        self.window_count = 0  # Vectors in the running window
+        self.window_sum = np.zeros(vec_len)
+        self.window_weight = np.zeros(vec_len)
+
+        # Warm start from the last saved solution (memory-mapped, copy-on-write)
+        self.store = CalibrationStore(store_directory, vec_len, sample_rate) if store_directory else None
+        self.solution_pending = False  # Hot/cold measurement not saved yet
+        if self.store:
+            solution = self.store.latest()
+            if solution is not None:
+                self.hot_spectrum = solution["hot_spectrum"]
+                self.cold_spectrum = solution["cold_spectrum"]
+                self.Tsys = solution["Tsys"]
+                self.Gsys = solution["Gsys"]
+                self.HCR = self.hot_spectrum / self.cold_spectrum
+        self.message_port_register_out(pmt.intern("solution"))
+        self.update_transform()
+
+        # Switched modes: current state (True for signal) and running sums of each state
+        self.switch_channels = switch_channels
+        self.switch_signal = True
+        self.signal_sum = np.zeros(vec_len)
+        self.signal_count = np.zeros(vec_len)
+        self.reference_sum = np.zeros(vec_len)
+        self.reference_count = np.zeros(vec_len)
+        self.message_port_register_in(pmt.intern("switch"))
+        self.set_msg_handler(pmt.intern("switch"), self.handle_switch)
+
     def set_calibration_type(self, calibration_type):
-        """ Updates the calibration type. """
+        """ Updates the calibration type, saving the solution when a hot/cold measurement ends. """
+        if calibration_type not in ("Hot", "Cold"):
+            self.save_solution()
+        if calibration_type != self.calibration_type:
+            self.reset_window()  # An incomplete window is dropped
+            if calibration_type in SWITCHED_TYPES:
+                self.reset_switching()
         self.calibration_type = calibration_type
         print(self.calibration_type)
 
+    def set_calibration_window(self, calibration_window):
+        """ Updates the number of vectors averaged per hot/cold measurement. """
+        self.calibration_window = max(1, calibration_window)
+        self.reset_window()
+
+    def reset_window(self):
+        """ Clears the running sums of the hot/cold window. """
+        self.window_count = 0
+        self.window_sum[:] = 0
+        self.window_weight[:] = 0
+
+    def set_switch_channels(self, switch_channels):
+        """ Updates the frequency switching offset, in channels. """
+        self.switch_channels = switch_channels
+
+    def handle_switch(self, msg):
+        """ 'switch' message: True (or a pair whose value is True) for signal vectors. """
+        if pmt.is_pair(msg):
+            msg = pmt.cdr(msg)
+        self.switch_signal = pmt.to_bool(msg)
+
+    def reset_switching(self):
+        """ Clears the running sums of the signal and reference states. """
+        self.signal_sum[:] = 0
+        self.signal_count[:] = 0
+        self.reference_sum[:] = 0
+        self.reference_count[:] = 0
+
+    def update_transform(self):
+        """
+        Caches the calibration transform out = in * scale - noise_offset, with the
+        noise term Gsys * KB * delta_f * Tsys, and the outputs of the current solution.
+        """
+        delta_f = self.sample_rate / self.vec_len  # Frequency resolution
+        self.scale = (1 / self.Gsys).astype(np.float32)
+        self.noise_offset = (self.Gsys * KB * delta_f * self.Tsys).astype(np.float32)
+        self.Tsys_out = self.Tsys.astype(np.float32)
+        self.Gsys_dB = (10 * np.log10(self.Gsys)).astype(np.float32)
+
+    def start(self):
+        """ Publishes the solution in force at startup (warm start or default). """
+        self.publish_solution()
+        return True
+
+    def publish_solution(self):
+        """ Sends Tsys and Gsys (dB) on the 'solution' message port. """
+        solution = pmt.make_dict()
+        solution = pmt.dict_add(solution, pmt.intern("Tsys"),
+                                pmt.init_f32vector(self.vec_len, self.Tsys_out.tolist()))
+        solution = pmt.dict_add(solution, pmt.intern("Gsys_dB"),
+                                pmt.init_f32vector(self.vec_len, self.Gsys_dB.tolist()))
+        self.message_port_pub(pmt.intern("solution"), solution)
+
+    def stop(self):
+        """ Saves a pending solution when the flowgraph stops. """
+        self.save_solution()
+        return True
+
+    def save_solution(self):
+        """ Saves the current solution to the store, if it changed since the last save. """
+        if self.store and self.solution_pending:
+            self.store.save(self.hot_spectrum, self.cold_spectrum, self.Tsys, self.Gsys)
+            self.solution_pending = False
+
     def work(self, input_items, output_items):
         """
-        Processes input data based on the selected calibration type.
+        Processes every input vector based on the selected calibration type.
 
         Args:
-            input_items (list): List of arrays containing input signals.
-            output_items (list): List of arrays to store output signals.
+            input_items (list): List of arrays containing input signals. Shape: (N, vec_len).
+            output_items (list): List of arrays to store output signals. Shape: (N, vec_len).
 
         Returns:
             int: Number of processed elements.
@@ -73,84 +223,223 @@ class Calibration(gr.sync_block):
         out0 = output_items[0]  # First output: processed data
         out1 = output_items[1]  # Second output: Tsys (System temperature)
         out2 = output_items[2]  # Third output: Gsys (System gain in dB)
+        num_vectors = len(in0)
 
-        KB = 1.380649e-23  # Boltzmann constant
-        C = 3e9  # Speed of light (m/s)
-        delta_f = self.sample_rate / self.vec_len  # Frequency resolution
-
-        # Copy input data for processing
-        self.a = in0[0, :].copy()
-        self.filtered_out0 = self.a[:]
+        # Smooth spikes in the input data (optional), written straight to the output
+        self.spike_smoothing(in0, out0)
 
-        # Smooth spikes in the input data (optional)
-        self.spike_smoothing()
+        # Channels flagged as RFI keep their previous reference
+        if self.sk_threshold > 0:
+            self.rfi_mask = kurtosis.mask(input_items[1][:num_vectors], self.sk_threshold)
+        else:
+            self.rfi_mask = None
 
         # Process data based on calibration type
-        if self.calibration_type == "Hot":
-            # Store the current spectrum as the "Hot" spectrum
-            self.hot_spectrum[:] = self.filtered_out0
+        if self.calibration_type in ("Hot", "Cold"):
+            # Every window closed in this call gives a new Tsys and Gsys
+            self.update_reference(out0, out1, out2)
+            return num_vectors
 
-            # Compute Hot/Cold Ratio (HCR)
-            self.HCR = self.hot_spectrum / self.cold_spectrum
-            self.HCR[self.HCR == 1] = 2  # Prevent division by zero
+        if self.calibration_type in SWITCHED_TYPES:
+            self.switched(out0, self.switch_states(num_vectors), out0)
 
-            # Compute system temperature (Tsys) and gain (Gsys)
-            self.Tsys = (self.Tground - self.HCR * self.Tsky) / (self.HCR - 1)
-            self.Gsys = self.cold_spectrum / (self.Tsky + self.Tsys)
-            self.Gsys[self.Gsys <= 0] = 1  # Avoid invalid values
+        if self.calibration_type == "Calibrated":
+            # Apply the cached calibration transform to the whole batch
+            np.multiply(out0, self.scale, out=out0)
+            np.subtract(out0, self.noise_offset, out=out0)
 
-        elif self.calibration_type == "Cold":
-            # Store the current spectrum as the "Cold" spectrum
-            self.cold_spectrum[:] = self.filtered_out0
+        # Store results in output buffers (cached, constant until the solution changes)
+        out1[:] = self.Tsys_out  # System temperature
+        out2[:] = self.Gsys_dB  # System gain in dB
+        return num_vectors
 
-            # Compute Hot/Cold Ratio (HCR)
-            self.HCR = self.hot_spectrum / self.cold_spectrum
-            self.HCR[self.HCR == 1] = 2  # Prevent division by zero
+    def update_reference(self, spectra, Tsys_out, Gsys_out):
+        """
+        Averages the spectra into the "Hot" or "Cold" reference and outputs, for each
+        vector, the solution of the last window closed.
 
-            # Compute system temperature (Tsys) and gain (Gsys)
-            self.Tsys = (self.Tground - self.HCR * self.Tsky) / (self.HCR - 1)
-            self.Gsys = self.cold_spectrum / (self.Tsky + self.Tsys)
-            self.Gsys[self.Gsys <= 0] = 1  # Avoid invalid values
+        Args:
+            spectra (np.ndarray): Despiked spectra, shape (N, vec_len).
+            Tsys_out (np.ndarray): System temperature output, shape (N, vec_len).
+            Gsys_out (np.ndarray): System gain output (dB), shape (N, vec_len).
+        """
+        num_vectors = len(spectra)
+        window = self.calibration_window
+        needed = window - self.window_count
+
+        # Last vector of each window closed in this call, and first vector of each segment
+        nb_closed = 0 if num_vectors < needed else 1 + (num_vectors - needed) // window
+        closing = needed - 1 + window * np.arange(nb_closed)
+        starts = np.concatenate(([0], closing[closing < num_vectors - 1] + 1))
+
+        # Per-channel sums of each segment, RFI-flagged channels excluded
+        if self.rfi_mask is None:
+            sums = np.add.reduceat(spectra, starts, axis=0, dtype=np.float64)
+            lengths = np.diff(np.append(starts, num_vectors)).astype(np.float64)
+            counts = np.repeat(lengths[:, None], self.vec_len, axis=1)
+        else:
+            weights = ~self.rfi_mask
+            sums = np.add.reduceat(np.where(weights, spectra, 0.0), starts, axis=0)
+            counts = np.add.reduceat(weights, starts, axis=0, dtype=np.float64)
+        sums[0] += self.window_sum
+        counts[0] += self.window_weight
+
+        # The segment after the last closed window is the new running window
+        self.window_count = (self.window_count + num_vectors) - window * nb_closed
+        if len(starts) > nb_closed:
+            self.window_sum[:] = sums[-1]
+            self.window_weight[:] = counts[-1]
+        else:
+            self.reset_window()
+
+        # Solutions in force during this call: the previous one, then one per closed window
+        Tsys = self.Tsys_out[None, :]
+        Gsys_dB = self.Gsys_dB[None, :]
+        if nb_closed:
+            window_Tsys, window_Gsys = self.close_windows(sums[:nb_closed], counts[:nb_closed])
+            Tsys = np.concatenate((Tsys, window_Tsys[:-1], self.Tsys_out[None, :]), dtype=np.float32)
+            Gsys_dB = np.concatenate((Gsys_dB, 10 * np.log10(window_Gsys[:-1]), self.Gsys_dB[None, :]),
+                                     dtype=np.float32)
+
+        # Each vector sees the solution of the last window closed at or before it
+        index = np.searchsorted(closing, np.arange(num_vectors), side="right")
+        np.take(Tsys, index, axis=0, out=Tsys_out, mode="clip")
+        np.take(Gsys_dB, index, axis=0, out=Gsys_out, mode="clip")
+
+    def close_windows(self, sums, counts):
+        """
+        Y-factor solutions of closed hot/cold windows, the last one becoming the current solution.
 
-        elif self.calibration_type == "Calibrated":
-            # Apply calibration to the input signal
-            self.filtered_out0 = (self.filtered_out0 / self.Gsys) - self.Gsys * KB * delta_f * self.Tsys
+        Args:
+            sums (np.ndarray): Per-channel sums of each window, shape (W, vec_len).
+            counts (np.ndarray): Per-channel number of unflagged vectors, shape (W, vec_len).
 
-        elif self.calibration_type == "Non_calibrated":
-            # Non-calibrated mode: pass data through unchanged
-            self.filtered_out0 = self.filtered_out0
+        Returns:
+            tuple: System temperature and gain of each window, shape (W, vec_len).
+        """
+        measured = self.hot_spectrum if self.calibration_type == "Hot" else self.cold_spectrum
+        # Channels without any unflagged vector keep the previous average
+        index = np.where(counts > 0, np.arange(len(sums))[:, None], -1)
+        np.maximum.accumulate(index, axis=0, out=index)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means = np.take_along_axis(sums / counts, np.maximum(index, 0), axis=0)
+        references = np.where(index >= 0, means, measured)
+        if self.calibration_type == "Hot":
+            hot, cold = references, self.cold_spectrum
+        else:
+            hot, cold = self.hot_spectrum, references
+
+        HCR, Tsys, Gsys = self.solve(hot, cold)
+
+        # Solution of the last window
+        measured[:] = references[-1]
+        self.HCR = HCR[-1]
+        self.Tsys = Tsys[-1]
+        self.Gsys = Gsys[-1]
+        self.update_transform()
+        self.publish_solution()
+        self.solution_pending = True
+        return Tsys, Gsys
+
+    def switch_states(self, num_vectors):
+        """
+        State of each input vector, from the 'switch' tags (the state set by a tag
+        holds until the next one) or the last 'switch' message.
 
-        # Store results in output buffers
-        out0[:] = self.filtered_out0
-        out1[:] = self.Tsys  # System temperature
-        out2[:] = 10 * np.log10(self.Gsys)  # System gain in dB
-        return len(output_items[0])
+        Args:
+            num_vectors (int): Number of input vectors.
 
-    def spike_smoothing(self):
+        Returns:
+            np.ndarray: True for signal vectors, shape (N,).
         """
-        Smooths spikes in the input data.
-        Detects extreme values and replaces them with the median of neighboring points.
+        states = np.full(num_vectors, self.switch_signal)
+        first_item = self.nitems_read(0)
+        tags = self.get_tags_in_window(0, 0, num_vectors, pmt.intern("switch"))
+        for tag in sorted(tags, key=lambda tag: tag.offset):
+            self.switch_signal = pmt.to_bool(tag.value)
+            states[tag.offset - first_item:] = self.switch_signal
+        return states
+
+    def switched(self, spectra, states, out):
         """
-        #indice_max = np.argmax(self.a)  # Index of the maximum value
+        Switched calibration (sig - ref) / ref of every vector from the running
+        averages of both states.
 
-        # Define a threshold based on local mean intensity
-        threshold = 1.2*np.mean(self.a[2541:2786])
-        abovethresh_index = np.where(self.a > threshold)[0]
-        #print(abovethresh_index)
-        # Indices of spikes
+        Args:
+            spectra (np.ndarray): Despiked spectra, shape (N, vec_len).
+            states (np.ndarray): True for signal vectors, shape (N,).
+            out (np.ndarray): Output spectra, shape (N, vec_len), may be spectra itself.
+        """
+        weights = np.ones(spectra.shape, dtype=bool) if self.rfi_mask is None else ~self.rfi_mask
+        signal = weights & states[:, None]
+        reference = weights & ~states[:, None]
+
+        # Running sums and counts after each vector
+        signal_sums = np.cumsum(np.where(signal, spectra, 0.0), axis=0) + self.signal_sum
+        signal_counts = np.cumsum(signal, axis=0) + self.signal_count
+        reference_sums = np.cumsum(np.where(reference, spectra, 0.0), axis=0) + self.reference_sum
+        reference_counts = np.cumsum(reference, axis=0) + self.reference_count
+        self.signal_sum[:] = signal_sums[-1]
+        self.signal_count[:] = signal_counts[-1]
+        self.reference_sum[:] = reference_sums[-1]
+        self.reference_count[:] = reference_counts[-1]
+
+        # (sig - ref) / ref = (sig_sum / sig_count) * (ref_count / ref_sum) - 1, 0 until both are known
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = signal_sums / signal_counts * reference_counts / reference_sums - 1.0
+        ratio[~np.isfinite(ratio)] = 0
+
+        if self.calibration_type == "Frequency_switching" and self.switch_channels:
+            # The line is positive at its channel and negative switch_channels higher:
+            # fold the negative image back and average both (half-amplitude negative
+            # ghosts remain switch_channels away on each side). Channels whose image
+            # falls outside the band cannot be folded and are set to NaN, as in Save.
+            shift = self.switch_channels
+            if shift > 0:
+                folded, image, edge = slice(None, -shift), slice(shift, None), slice(-shift, None)
+            else:
+                folded, image, edge = slice(-shift, None), slice(None, shift), slice(None, -shift)
+            ratio[:, folded] -= ratio[:, image]
+            ratio[:, folded] /= 2
+            ratio[:, edge] = np.nan
+        np.copyto(out, ratio, casting="same_kind")
+
+    def solve(self, hot, cold):
+        """
+        Y-factor solution from hot and cold spectra, of shape (vec_len,) or (N, vec_len).
 
-        # Copy input data for processing
-        self.filtered_out0 = self.a[:]
-        #print(self.filtered_out0.shape)
+        Returns:
+            tuple: Hot/Cold power ratio, system temperature (Kelvin) and system gain.
+        """
+        # Compute Hot/Cold Ratio (HCR)
+        HCR = hot / cold
+        HCR[HCR == 1] = 2  # Prevent division by zero
 
+        # Compute system temperature (Tsys) and gain (Gsys)
+        Tsys = (self.Tground - HCR * self.Tsky) / (HCR - 1)
+        Gsys = cold / (self.Tsky + Tsys)
+        Gsys[Gsys <= 0] = 1  # Avoid invalid values
+        return HCR, Tsys, Gsys
 
-        # Replace spikes with median values from neighboring points
-        for index in abovethresh_index:
-            lowerbound = max(1, index - 10)  # Lower limit
-            upperbound = min(index + 10, self.vec_len)  # Upper limit
+    def set_spike_threshold(self, spike_threshold):
+        """ Updates the spike threshold, relative to the mean of the reference band (0 to disable). """
+        self.spike_threshold = spike_threshold
 
-            # Replace the spike with the median of the surrounding values
-            self.filtered_out0[index] = np.median(self.a[lowerbound:upperbound])
+    def set_reference_band(self, reference_band):
+        """ Updates the (first, last) channels of the reference band, None for the default band. """
+        self.reference = despike.reference_channels(self.vec_len, reference_band)
 
-            # Debugging output
+    def spike_smoothing(self, spectra, out):
+        """
+        Smooths spikes in the input data.
+        Detects values above spike_threshold times the mean of the reference band and
+        replaces them with the median of the neighbouring channels.
 
+        Args:
+            spectra (np.ndarray): Input spectra, shape (N, vec_len).
+            out (np.ndarray): Output spectra, shape (N, vec_len).
+        """
+        if self.spike_threshold <= 0:
+            out[:] = spectra
+            return
+        despike.despike(spectra, self.reference, self.spike_threshold, self.spike_window, out=out)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 Mathias Huyghe.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import numpy as np
+from gnuradio import gr
+
+from .fft_backends import BatchFFT
+
+
+class FFT(gr.sync_block):
+    """
+    GNU Radio block computing the forward FFT of every input vector.
+    All vectors of a work call are transformed in a single batched call, using
+    numpy, multi-threaded scipy.fft or pyFFTW.
+    """
+
+    def __init__(self, vec_len, shift, backend, nthreads, wisdom_file=""):
+        """
+        Initializes the FFT block.
+
+        Args:
+            vec_len (int): FFT size (length of input/output vectors).
+            shift (bool): Move the zero frequency to the center of the spectrum.
+            backend (str): FFT backend ('numpy', 'scipy', 'pyfftw').
+            nthreads (int): Number of threads for the 'scipy' and 'pyfftw' backends.
+            wisdom_file (str): FFTW wisdom file of the 'pyfftw' backend, loaded at startup
+                and saved when the flowgraph stops ("" for none).
+        """
+        gr.sync_block.__init__(self,
+                               name="FFT",  # Name of the block
+                               in_sig=[(np.complex64, int(vec_len))],  # Input: vector of complex64
+                               out_sig=[(np.complex64, int(vec_len))])  # Output: vector of complex64
+
+        self.vec_len = vec_len
+        self.shift = shift
+        self.fft = BatchFFT(vec_len, backend, nthreads, wisdom_file)
+
+    def stop(self):
+        """ Saves the FFTW wisdom gathered while running. """
+        self.fft.save_wisdom()
+        return True
+
+    def work(self, input_items, output_items):
+        """
+        Main method for processing data.
+
+        Args:
+            input_items (list): List of input arrays. Shape: (N, vec_len).
+            output_items (list): List of output arrays. Shape: (N, vec_len).
+
+        Returns:
+            int: Number of output vectors produced.
+        """
+        in0 = input_items[0]
+        out = output_items[0]
+
+        spectrum = self.fft(in0)
+        if self.shift:
+            half = self.vec_len // 2
+            out[:, half:] = spectrum[:, :self.vec_len - half]
+            out[:, :half] = spectrum[:, self.vec_len - half:]
+        else:
+            out[:] = spectrum
+
+        return len(out)
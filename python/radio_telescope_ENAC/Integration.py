@@ -6,79 +6,644 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 #
 
+import threading
+import time
+
 import numpy as np
+import pmt
 from gnuradio import gr
+from scipy.signal import lfilter
+
+from . import kurtosis
+
+SMOOTHING_MODES = ("ema", "boxcar")
+ROBUST_MODES = ("sigma_clip", "median_of_means")
+MODES = ("mean",) + SMOOTHING_MODES + ROBUST_MODES
+ACCUMULATORS = ("float32", "float64", "kahan")
 
+CLIP_ITERATIONS = 5  # Maximum number of sigma clipping passes
+MAD_TO_SIGMA = 1.4826  # Median absolute deviation to standard deviation, for Gaussian noise
 
-class Integration(gr.decim_block):
+
+class Integration(gr.basic_block):
     """
     GNU Radio block for vector integration.
     Accumulates input data over a specified number of iterations
-    and outputs the averaged result.
+    and outputs the averaged result. Every average completed by the
+    input buffer is emitted in the same work call; only the incomplete
+    remainder is kept in the accumulator.
+
+    When the sample rate is given, the integration can be set in seconds and each
+    output vector carries 'rx_time' (start), 'rx_time_end' and 'nb_frames' stream
+    tags. Times follow the last upstream 'rx_time' tag, or the host clock when the
+    source does not provide one.
+
+    Besides the block 'mean', two smoothing modes output one spectrum per input
+    vector: 'ema' (exponential moving average with a time constant of
+    nb_integration vectors) and 'boxcar' (sliding mean over the last
+    nb_integration vectors, kept in a ring buffer with a running sum).
+
+    The robust modes 'sigma_clip' and 'median_of_means' also output one spectrum per
+    nb_integration vectors, but split the window into nb_blocks sub-blocks and keep
+    one partial sum per sub-block and channel. At the end of the window each channel
+    takes the median of its sub-block means, or the mean of the sub-blocks left after
+    iterative clipping around the median, so a burst only spoils its own sub-block.
+    With nb_blocks equal to nb_integration, individual vectors are rejected.
+
+    In the block modes, a second output can carry the generalized spectral kurtosis
+    of each integration, from per-channel sums S1 = sum(x) and S2 = sum(x**2)
+    accumulated alongside the average. It is 1 on Gaussian noise; see the kurtosis
+    module for the RFI threshold.
+
+    The block modes can also output, per channel, the maximum (max-hold), the
+    minimum (min-hold) and the position in the integration of the maximum
+    (argmax-frame, 0 for the first vector), computed from the same input block.
+
+    The 'mean' accumulator is float32 by default. For long integrations it can be
+    float64, or float32 with Kahan compensated summation over the vectors and across
+    work calls ('kahan').
     """
 
-    def __init__(self, vec_len, nb_integration):
+    def __init__(self, vec_len, nb_integration, samp_rate=0, integration_time=0, nb_accumulation=1,
+                 mode="mean", nb_blocks=8, clip_sigma=3.0, spectral_kurtosis=False,
+                 accumulator="float32", hold=False):
         """
         Initializes the Integration block with vector size and integration parameters.
 
         Args:
             vec_len (int): Length of input and output vectors.
             nb_integration (int): Number of iterations for integration.
+            samp_rate (float): Sampling rate of the signal, 0 to disable timing and tags.
+            integration_time (float): Integration time in seconds, overrides nb_integration when > 0.
+            nb_accumulation (int): Number of spectra already summed per input vector upstream.
+            mode (str): Integration mode ('mean', 'ema', 'boxcar', 'sigma_clip', 'median_of_means').
+            nb_blocks (int): Number of sub-blocks per integration in the robust modes.
+            clip_sigma (float): Clipping threshold, in standard deviations, of the 'sigma_clip' mode.
+            spectral_kurtosis (bool): Adds a second output with the spectral kurtosis of each integration.
+            accumulator (str): Accumulation of the 'mean' mode ('float32', 'float64', 'kahan').
+            hold (bool): Adds max-hold, min-hold and argmax-frame outputs, after the spectral kurtosis.
         """
-        gr.decim_block.__init__(self,
+        if mode not in MODES:
+            raise ValueError(f"Invalid integration mode: {mode}")
+        if spectral_kurtosis and mode in SMOOTHING_MODES:
+            raise ValueError("The spectral kurtosis needs a block integration mode")
+        if hold and mode in SMOOTHING_MODES:
+            raise ValueError("The max/min hold needs a block integration mode")
+        if accumulator not in ACCUMULATORS:
+            raise ValueError(f"Invalid accumulator: {accumulator}")
+
+        out_sig = [(np.float32, int(vec_len))]  # Output: vector of float32
+        if spectral_kurtosis:
+            out_sig.append((np.float32, int(vec_len)))  # Spectral kurtosis per channel
+        if hold:
+            out_sig.extend([(np.float32, int(vec_len))] * 3)  # Max-hold, min-hold, argmax-frame
+        gr.basic_block.__init__(self,
                                 name="Integration",  # Name of the block
                                 in_sig=[(np.float32, int(vec_len))],  # Input: vector of float32
-                                out_sig=[(np.float32, int(vec_len))],  # Output: vector of float32
-                                decim=nb_integration)  # Decimation factor
+                                out_sig=out_sig)
 
         # Store the vector length and integration count
         self.vec_len = vec_len
-        self.nb_integration = max(1, nb_integration)  # Ensure at least 1 to prevent division by zero
-        self.iteration = 0  # Counter for tracking integration steps
-        self.set_relative_rate(1.0 / self.nb_integration)  # Adjust relative rate for decimation
+        self.mode = mode
+        self.iteration = 0  # Number of vectors currently in the accumulator
+        self.nb_blocks = max(1, nb_blocks)
+        self.clip_sigma = clip_sigma
+
+        # Preallocate an array to store accumulated results, with the running
+        # compensation (lost low-order bits) of the Kahan summation
+        self.integrate_result = np.zeros(vec_len, dtype=np.float64 if accumulator == "float64" else np.float32)
+        self.compensation = np.zeros(vec_len, dtype=np.float32) if accumulator == "kahan" else None
+
+        # Power sums of the spectral kurtosis (float64: S2 / S1**2 is close to 1 / M)
+        self.spectral_kurtosis = spectral_kurtosis
+        self.nb_accumulation = max(1, nb_accumulation)
+        self.power_sum = np.zeros(vec_len, dtype=np.float64)
+        self.square_sum = np.zeros(vec_len, dtype=np.float64)
 
-        # Preallocate an array to store accumulated results
-        self.integrate_result = np.zeros(vec_len, dtype=np.float32)
+        # Extremes of the running integration, valid when self.iteration > 0
+        self.hold = hold
+        self.hold_port = 2 if spectral_kurtosis else 1  # First of the three hold outputs
+        self.max_hold = np.zeros(vec_len, dtype=np.float32)
+        self.min_hold = np.zeros(vec_len, dtype=np.float32)
+        self.argmax_frame = np.zeros(vec_len, dtype=np.int64)
+        # Integration length staged by the callbacks, applied by the work thread
+        self.lock = threading.Lock()
+        self.pending_integration = None
+        self.set_integration_number(nb_integration)
+
+        # Timing: duration of one input vector and time reference (input item, seconds)
+        self.samp_rate = samp_rate
+        self.frame_duration = vec_len * self.nb_accumulation / samp_rate if samp_rate > 0 else 0
+        self.time_ref = None
+        if self.frame_duration:
+            # Output tags are generated here, upstream tags must not be copied over them
+            self.set_tag_propagation_policy(gr.TPP_DONT)
+        self.set_integration_time(integration_time)
+        self.swap_integration_number()
 
     def set_integration_number(self, nb_integration):
         """
         Dynamically updates the number of integration iterations.
 
+        This is a GRC callback, called outside the scheduler thread: the new value is
+        staged and only applied at the start of the next general_work() call, so the
+        buffers of a running call are never reallocated under it.
+
         Args:
             nb_integration (int): New number of iterations for integration.
         """
-        self.nb_integration = max(1, nb_integration)  # Prevent zero division
-        self.set_relative_rate(1.0 / self.nb_integration)
+        with self.lock:
+            self.pending_integration = max(1, nb_integration)  # Prevent zero division
+
+    def swap_integration_number(self):
+        """
+        Applies the staged number of integration iterations, if any. Called between work calls only.
+        """
+        if self.pending_integration is None:
+            return
+        with self.lock:
+            self.nb_integration, self.pending_integration = self.pending_integration, None
+        if self.mode in SMOOTHING_MODES:
+            self.set_relative_rate(1.0)
+            self.reset_smoothing()
+        else:
+            self.set_relative_rate(1.0 / self.nb_integration)
+        if self.mode in ROBUST_MODES:
+            self.reset_blocks()
+
+    def reset_smoothing(self):
+        """
+        Clears the state of the 'ema' and 'boxcar' modes.
+        Reallocates the ring buffer: only called from swap_integration_number().
+        """
+        self.seen = 0  # Number of vectors smoothed so far, capped at nb_integration
+        self.ema = np.zeros(self.vec_len, dtype=np.float32)
+        # Ring buffer of the last nb_integration vectors and its running sum (float64 to avoid drift)
+        self.ring = np.zeros((self.nb_integration, self.vec_len), dtype=np.float32)
+        self.ring_pos = 0  # Row of the oldest vector in the ring
+        self.running_sum = np.zeros(self.vec_len, dtype=np.float64)
+
+    def reset_blocks(self):
+        """
+        Clears the sub-block sums of the robust modes, dropping the running integration.
+        Reallocates the sub-block buffers: only called from swap_integration_number().
+        """
+        self.iteration = 0
+        num_blocks = min(self.nb_blocks, self.nb_integration)
+        # First vector of each sub-block within the window, and sub-block lengths
+        index = self.block_index(np.arange(self.nb_integration))
+        self.block_edges = np.concatenate(([0], np.flatnonzero(np.diff(index)) + 1))
+        self.block_sizes = np.diff(np.append(self.block_edges, self.nb_integration))
+        self.block_sums = np.zeros((num_blocks, self.vec_len), dtype=np.float32)
+        self.block_counts = np.zeros(num_blocks, dtype=np.int64)
+        # The spectral kurtosis restarts with the integration
+        self.power_sum[:] = 0
+        self.square_sum[:] = 0
+
+    def block_index(self, positions):
+        """ Sub-block of each position within the integration window. """
+        num_blocks = min(self.nb_blocks, self.nb_integration)
+        return np.minimum(positions * num_blocks // self.nb_integration, num_blocks - 1)
 
-    def work(self, input_items, output_items):
+    def set_integration_time(self, integration_time):
+        """
+        Sets the integration time in seconds (rounded to a whole number of input vectors).
+
+        Args:
+            integration_time (float): Integration time in seconds, ignored when <= 0.
+        """
+        if integration_time <= 0:
+            return
+        if not self.frame_duration:
+            raise ValueError("The integration time needs a sample rate")
+        self.set_integration_number(int(round(integration_time / self.frame_duration)))
+
+    def update_time_reference(self, num_frames):
+        """
+        Follows the upstream 'rx_time' tags, or starts from the host clock.
+
+        Args:
+            num_frames (int): Number of input vectors read in this call.
+        """
+        tags = self.get_tags_in_window(0, 0, num_frames, pmt.intern("rx_time"))
+        if tags:
+            tag = tags[-1]
+            seconds = pmt.to_uint64(pmt.tuple_ref(tag.value, 0)) + pmt.to_double(pmt.tuple_ref(tag.value, 1))
+            self.time_ref = (tag.offset, seconds)
+        elif self.time_ref is None:
+            self.time_ref = (self.nitems_read(0), time.time())
+
+    def item_time(self, index):
+        """ Time, in seconds, of the absolute input vector index. """
+        return self.time_ref[1] + (index - self.time_ref[0]) * self.frame_duration
+
+    @staticmethod
+    def time_value(seconds):
+        """ 'rx_time' tag value: (whole seconds, fractional seconds). """
+        whole = int(seconds)
+        return pmt.make_tuple(pmt.from_uint64(whole), pmt.from_double(seconds - whole))
+
+    def tag_outputs(self, starts, counts):
+        """
+        Attaches timing tags to the output vectors produced by this call.
+
+        Args:
+            starts (np.ndarray): Absolute index of the first input vector of each output.
+            counts (np.ndarray): Number of input vectors of each output.
+        """
+        offset = self.nitems_written(0)
+        for k, (start, count) in enumerate(zip(starts, counts)):
+            start_time = self.item_time(start)
+            self.add_item_tag(0, offset + k, pmt.intern("rx_time"), self.time_value(start_time))
+            self.add_item_tag(0, offset + k, pmt.intern("rx_time_end"),
+                              self.time_value(start_time + count * self.frame_duration))
+            self.add_item_tag(0, offset + k, pmt.intern("nb_frames"), pmt.from_long(int(count)))
+
+    def forecast(self, noutput_items, ninputs):
+        """
+        Number of input vectors needed to produce noutput_items averages.
+        """
+        if self.mode in SMOOTHING_MODES:
+            required = noutput_items
+        else:
+            required = max(1, noutput_items * self.nb_integration - self.iteration)
+        return [required] * ninputs
+
+    def general_work(self, input_items, output_items):
         """
         Main method for processing data.
 
         Args:
             input_items (list): List of input arrays. Shape: (N, vec_len).
-            output_items (list): List of output arrays. Shape: (1, vec_len).
+            output_items (list): List of output arrays. Shape: (M, vec_len).
 
         Returns:
-            int: Number of output vectors produced (either 1 or 0).
+            int: Number of output vectors produced.
         """
         in0 = input_items[0]  # Input signal array: shape (N, vec_len)
-        out = output_items[0]  # Output signal array: shape (1, vec_len)
+        out = output_items[0]  # Output signal array: shape (M, vec_len)
+        self.swap_integration_number()
+
+        # Consume everything, unless the output buffer cannot hold the results
+        if self.mode in SMOOTHING_MODES:
+            num_frames = min(len(in0), len(out))
+        else:
+            num_frames = min(len(in0), max(0, len(out) * self.nb_integration - self.iteration))
+        frames = in0[:num_frames]
+        if self.frame_duration:
+            first_item = self.nitems_read(0)
+            self.update_time_reference(num_frames)
+        self.consume(0, num_frames)
+
+        if self.spectral_kurtosis:
+            # Uses the running integration as it was before this call
+            self.kurtosis(frames, output_items[1])
+        if self.hold:
+            self.extremes(frames, *output_items[self.hold_port:self.hold_port + 3])
+
+        if self.mode == "mean":
+            produced, starts, counts = self.average(frames, out)
+        elif self.mode in ROBUST_MODES:
+            produced, starts, counts = self.robust_average(frames, out)
+        else:
+            produced, starts, counts = self.smooth(frames, out)
+
+        if self.frame_duration and produced:
+            self.tag_outputs(first_item + starts, counts)
+
+        return produced
+
+    def average(self, frames, out):
+        """
+        Block averages of nb_integration vectors ('mean' mode).
+
+        Args:
+            frames (np.ndarray): Input vectors, shape (N, vec_len).
+            out (np.ndarray): Output buffer.
+
+        Returns:
+            tuple: Number of outputs, first input vector of each output relative to
+            frames[0] (negative when it was read in a previous call) and number of
+            input vectors of each output.
+        """
+        nb_integration = self.nb_integration
+        num_frames = len(frames)
+
+        # Number of vectors missing to complete the running integration
+        needed = max(0, nb_integration - self.iteration)
+        produced = self.window_sums(frames, self.integrate_result, out, self.compensation)
+        if produced == 0:
+            # Not enough data yet, no output
+            self.iteration += num_frames
+            return 0, None, None
+
+        starts, counts = self.window_layout(needed, produced - 1, self.iteration + needed)
+        out[:produced] /= counts[:, None]
+
+        # Keep only the incomplete remainder in the accumulator
+        self.iteration = (num_frames - needed) % nb_integration
+
+        return produced, starts, counts
+
+    def window_sums(self, values, accumulator, out, compensation=None):
+        """
+        Sums of the values over every integration completed by this call.
 
-        # Accumulate input data over multiple iterations
-        np.add(self.integrate_result, np.sum(in0, axis=0), out=self.integrate_result)
+        The first sum starts with the accumulator, which then keeps the sum of the
+        incomplete remainder. self.iteration is left to the caller. Sums are taken in
+        the accumulator precision.
 
-        # Update iteration count based on input size
-        self.iteration += in0.shape[0]
+        Args:
+            values (np.ndarray): Values of the input vectors, shape (N, vec_len).
+            accumulator (np.ndarray): Sum of the running integration, updated in place.
+            out (np.ndarray): Output buffer for the sums.
+            compensation (np.ndarray): Kahan compensation of the accumulator, None for a plain sum.
 
-        # Check if we have accumulated enough data to output a result
-        if self.iteration >= self.nb_integration:
-            # Compute the average by dividing by the number of iterations
-            out[:] = self.integrate_result / self.nb_integration
+        Returns:
+            int: Number of completed integrations.
+        """
+        nb_integration = self.nb_integration
+        needed = max(0, nb_integration - self.iteration)
+        if len(values) < needed:
+            self.add_rows(values, accumulator, compensation)
+            return 0
 
-            # Reset the accumulator and iteration counter
-            self.integrate_result.fill(0)
-            self.iteration = 0
+        # Complete the running integration with the first vectors of the buffer
+        self.add_rows(values[:needed], accumulator, compensation)
+        if compensation is None:
+            out[0] = accumulator
+        else:
+            # The compensated sum is total - compensation
+            out[0] = accumulator - compensation
 
-            return 1  # Successfully produced one output vector
+        # Every further complete group of nb_integration vectors gives one more sum
+        rest = values[needed:]
+        nb_groups = len(rest) // nb_integration
+        grouped = rest[:nb_groups * nb_integration].reshape(nb_groups, nb_integration, self.vec_len)
+        if compensation is None:
+            np.sum(grouped, axis=1, dtype=accumulator.dtype, out=out[1:1 + nb_groups])
         else:
-            return 0  # Not enough data yet, no output
+            # All groups summed together, one vector position at a time
+            totals = np.zeros((nb_groups, self.vec_len), dtype=accumulator.dtype)
+            corrections = np.zeros_like(totals)
+            self.add_rows(grouped.swapaxes(0, 1), totals, corrections)
+            np.subtract(totals, corrections, out=out[1:1 + nb_groups], casting="same_kind")
+
+        accumulator[:] = 0
+        if compensation is not None:
+            compensation[:] = 0
+        self.add_rows(rest[nb_groups * nb_integration:], accumulator, compensation)
+        return 1 + nb_groups
+
+    @staticmethod
+    def add_rows(rows, total, compensation=None):
+        """
+        Adds rows[0], rows[1], ... to total in place.
+
+        Args:
+            rows (np.ndarray): Values to add, shape (N,) + total.shape.
+            total (np.ndarray): Running sum, updated in place.
+            compensation (np.ndarray): Kahan compensation of total, updated in place,
+                or None for a plain sum in the precision of total. The compensated
+                sum is total - compensation.
+        """
+        if compensation is None:
+            np.add(total, np.sum(rows, axis=0, dtype=total.dtype), out=total)
+            return
+        corrected = np.empty_like(total)
+        updated = np.empty_like(total)
+        for row in rows:
+            np.subtract(row, compensation, out=corrected)
+            np.add(total, corrected, out=updated)
+            # Low-order bits of corrected that did not make it into updated
+            np.subtract(updated, total, out=compensation)
+            compensation -= corrected
+            total[:] = updated
+
+    def kurtosis(self, frames, sk_out):
+        """
+        Spectral kurtosis of every integration completed by this call.
+
+        Args:
+            frames (np.ndarray): Input vectors, shape (N, vec_len).
+            sk_out (np.ndarray): Spectral kurtosis output buffer.
+        """
+        needed = max(0, self.nb_integration - self.iteration)
+        nb_windows = 1 + (len(frames) - needed) // self.nb_integration if len(frames) >= needed else 0
+        s1 = np.empty((nb_windows, self.vec_len), dtype=np.float64)
+        s2 = np.empty_like(s1)
+        produced = self.window_sums(frames, self.power_sum, s1)
+        self.window_sums(np.square(frames, dtype=np.float64), self.square_sum, s2)
+        if produced:
+            _, counts = self.window_layout(needed, produced - 1, self.iteration + needed)
+            kurtosis.estimator(s1[:produced], s2[:produced], counts, self.nb_accumulation,
+                               out=sk_out[:produced])
+
+    def extremes(self, frames, max_out, min_out, argmax_out):
+        """
+        Max-hold, min-hold and argmax-frame of every integration completed by this call.
+
+        Args:
+            frames (np.ndarray): Input vectors, shape (N, vec_len).
+            max_out (np.ndarray): Max-hold output buffer.
+            min_out (np.ndarray): Min-hold output buffer.
+            argmax_out (np.ndarray): Argmax-frame output buffer.
+        """
+        nb_integration = self.nb_integration
+        needed = max(0, nb_integration - self.iteration)
+        head = frames[:needed]
+        if len(head):
+            self.hold_rows(head, self.iteration)
+        if len(frames) < needed:
+            return
+
+        max_out[0] = self.max_hold
+        min_out[0] = self.min_hold
+        argmax_out[0] = self.argmax_frame
+
+        # Every further complete group of nb_integration vectors
+        rest = frames[needed:]
+        nb_groups = len(rest) // nb_integration
+        grouped = rest[:nb_groups * nb_integration].reshape(nb_groups, nb_integration, self.vec_len)
+        argmax = np.argmax(grouped, axis=1)
+        max_out[1:1 + nb_groups] = np.take_along_axis(grouped, argmax[:, None, :], axis=1)[:, 0]
+        np.min(grouped, axis=1, out=min_out[1:1 + nb_groups])
+        argmax_out[1:1 + nb_groups] = argmax
+
+        # Extremes of the incomplete remainder
+        remainder = rest[nb_groups * nb_integration:]
+        if len(remainder):
+            self.hold_rows(remainder, 0)
+
+    def hold_rows(self, rows, position):
+        """
+        Merges consecutive vectors into the extremes of the running integration.
+
+        Args:
+            rows (np.ndarray): Input vectors, shape (N, vec_len), N > 0.
+            position (int): Position of rows[0] within the integration.
+        """
+        argmax = np.argmax(rows, axis=0)
+        row_max = np.take_along_axis(rows, argmax[None, :], axis=0)[0]
+        row_min = np.min(rows, axis=0)
+        if position == 0:
+            # First vectors of the integration
+            self.max_hold[:] = row_max
+            self.min_hold[:] = row_min
+            self.argmax_frame[:] = argmax
+            return
+        higher = row_max > self.max_hold
+        np.copyto(self.max_hold, row_max, where=higher)
+        np.copyto(self.argmax_frame, argmax + position, where=higher)
+        np.minimum(self.min_hold, row_min, out=self.min_hold)
+
+    def window_layout(self, needed, nb_groups, first_count):
+        """
+        First input vector, relative to the current call, and number of input vectors
+        of each window completed by the call.
+        """
+        # The running integration started with the vectors left in the accumulator
+        starts = np.concatenate(([-self.iteration], needed + self.nb_integration * np.arange(nb_groups)))
+        counts = np.concatenate(([first_count], np.full(nb_groups, self.nb_integration)))
+        return starts, counts
+
+    def robust_average(self, frames, out):
+        """
+        Robust averages of nb_integration vectors ('sigma_clip' and 'median_of_means' modes).
+
+        Args:
+            frames (np.ndarray): Input vectors, shape (N, vec_len).
+            out (np.ndarray): Output buffer.
+
+        Returns:
+            tuple: Number of outputs, first input vector of each output relative to
+            frames[0] and number of input vectors of each output.
+        """
+        nb_integration = self.nb_integration
+        num_frames = len(frames)
+
+        needed = nb_integration - self.iteration
+        if num_frames < needed:
+            self.accumulate_blocks(frames, self.iteration)
+            self.iteration += num_frames
+            return 0, None, None
+
+        # Sub-block sums of the running window and of every further complete window
+        self.accumulate_blocks(frames[:needed], self.iteration)
+        rest = frames[needed:]
+        nb_groups = len(rest) // nb_integration
+        grouped = rest[:nb_groups * nb_integration].reshape(nb_groups, nb_integration, self.vec_len)
+        sums = np.empty((1 + nb_groups,) + self.block_sums.shape, dtype=np.float32)
+        sums[0] = self.block_sums
+        np.add.reduceat(grouped, self.block_edges, axis=1, out=sums[1:])
+        counts = np.empty(sums.shape[:2], dtype=np.int64)
+        counts[0] = self.block_counts
+        counts[1:] = self.block_sizes
+        self.robust_estimate(sums, counts, out[:1 + nb_groups])
+
+        starts, frame_counts = self.window_layout(needed, nb_groups, nb_integration)
+
+        # Keep only the incomplete remainder in the sub-block sums
+        remainder = rest[nb_groups * nb_integration:]
+        self.block_sums[:] = 0
+        self.block_counts[:] = 0
+        self.accumulate_blocks(remainder, 0)
+        self.iteration = len(remainder)
+
+        return 1 + nb_groups, starts, frame_counts
+
+    def accumulate_blocks(self, frames, position):
+        """
+        Adds consecutive vectors to the sub-block sums of the running window.
+
+        Args:
+            frames (np.ndarray): Input vectors, shape (N, vec_len).
+            position (int): Position of frames[0] within the window.
+        """
+        if len(frames) == 0:
+            return
+        index = self.block_index(position + np.arange(len(frames)))
+        # One segment per sub-block touched by the vectors
+        segments = np.concatenate(([0], np.flatnonzero(np.diff(index)) + 1))
+        self.block_sums[index[segments]] += np.add.reduceat(frames, segments, axis=0)
+        self.block_counts[index[segments]] += np.diff(np.append(segments, len(frames)))
+
+    def robust_estimate(self, sums, counts, out):
+        """
+        Robust per-channel average of each window from its sub-block sums.
+
+        Args:
+            sums (np.ndarray): Sub-block sums, shape (W, nb_blocks, vec_len).
+            counts (np.ndarray): Number of vectors of each sub-block, shape (W, nb_blocks).
+            out (np.ndarray): Output, shape (W, vec_len).
+        """
+        means = sums / counts[:, :, None]
+        if self.mode == "median_of_means":
+            np.median(means, axis=1, out=out)
+            return
+
+        # Iterative clipping around the median, the spread being estimated from the
+        # median absolute deviation so that a single strong burst cannot hide itself
+        keep = np.ones(means.shape, dtype=bool)
+        for _ in range(CLIP_ITERATIONS):
+            kept = np.where(keep, means, np.nan)
+            center = np.nanmedian(kept, axis=1, keepdims=True)
+            deviation = np.abs(means - center)
+            spread = MAD_TO_SIGMA * np.nanmedian(np.where(keep, deviation, np.nan), axis=1, keepdims=True)
+            clipped = keep & (deviation <= self.clip_sigma * spread)
+            if np.array_equal(clipped, keep):
+                break
+            keep = clipped
+
+        # Mean of the vectors of the remaining sub-blocks
+        np.divide(np.sum(sums * keep, axis=1), np.sum(counts[:, :, None] * keep, axis=1), out=out,
+                  casting="same_kind")
+
+    def smooth(self, frames, out):
+        """
+        One smoothed spectrum per input vector ('ema' and 'boxcar' modes).
+
+        Args:
+            frames (np.ndarray): Input vectors, shape (N, vec_len).
+            out (np.ndarray): Output buffer.
+
+        Returns:
+            tuple: Number of outputs, first input vector of each output relative to
+            frames[0] and number of input vectors of each output.
+        """
+        num_frames = len(frames)
+        if num_frames == 0:
+            return 0, None, None
+        nb_integration = self.nb_integration
+        counts = np.minimum(self.seen + 1 + np.arange(num_frames), nb_integration)
+
+        if self.mode == "ema":
+            alpha = 1.0 / nb_integration
+            if self.seen == 0:
+                self.ema[:] = frames[0]  # Start from the first vector instead of zero
+            # y[n] = (1 - alpha) * y[n-1] + alpha * x[n], filtered along the vector axis
+            out[:num_frames], _ = lfilter([alpha], [1.0, alpha - 1.0], frames, axis=0,
+                                          zi=((1.0 - alpha) * self.ema)[None, :])
+            self.ema[:] = out[num_frames - 1]
+        else:
+            # Vector leaving the window when frames[k] enters: from the ring for the first
+            # nb_integration vectors, then from the block itself
+            from_ring = min(num_frames, nb_integration)
+            leaving = np.empty(frames.shape, dtype=np.float64)
+            leaving[:from_ring] = self.ring[(self.ring_pos + np.arange(from_ring)) % nb_integration]
+            leaving[from_ring:] = frames[:num_frames - from_ring]
+
+            # Running sum after each new vector
+            sums = np.cumsum(frames - leaving, axis=0)
+            sums += self.running_sum
+            self.running_sum[:] = sums[-1]
+            np.divide(sums, counts[:, None], out=out[:num_frames], casting="same_kind")
+
+            # Store the newest vectors in the ring, overwriting the oldest ones
+            rows = (self.ring_pos + np.arange(num_frames - from_ring, num_frames)) % nb_integration
+            self.ring[rows] = frames[num_frames - from_ring:]
+            self.ring_pos = (self.ring_pos + num_frames) % nb_integration
+
+        self.seen = min(self.seen + num_frames, nb_integration)
+        starts = np.arange(num_frames) - counts + 1
+        return num_frames, starts, counts
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 Mathias Huyghe.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+from functools import partial
+
+import numpy as np
+from gnuradio import gr
+
+from . import polyphase
+
+
+class InversePFB(gr.sync_block):
+    """
+    Inverse Polyphase Filter Bank (PFB synthesis).
+
+    Rebuilds the time series, as vec_len frames, from the FFT of a PFB output. The
+    output is delayed by synthesis_taps // 2 frames. For arrays loaded from disk,
+    polyphase.inverse_pfb() performs the same reconstruction in one batch.
+
+    Args:
+        vec_len (int): Length of the input vector.
+        window (str or tuple): Window type of the analysis PFB (see PFB).
+        num_taps (int): Number of taps of the analysis PFB.
+        synthesis_taps (int): Number of taps of the synthesis filter.
+        shifted (bool): True if the input spectra are in fftshift order.
+    """
+
+    def __init__(self, vec_len, window, num_taps, synthesis_taps, shifted):
+        """
+        Initialize the inverse Polyphase Filter Bank block.
+
+        Args:
+            vec_len (int): Length of the input vector.
+            window (str or tuple): Window type of the analysis PFB (see PFB).
+            num_taps (int): Number of taps of the analysis PFB.
+            synthesis_taps (int): Number of taps of the synthesis filter.
+            shifted (bool): True if the input spectra are in fftshift order.
+        """
+        self.vec_len = vec_len
+        self.num_taps = num_taps
+        self.synthesis_taps = synthesis_taps
+        self.shifted = shifted
+
+        gr.sync_block.__init__(
+            self,
+            name="InversePFB",
+            in_sig=[(np.complex64, vec_len)],  # Input: PFB spectra (complex64, vec_len)
+            out_sig=[(np.complex64, vec_len)],  # Output: time series frames (complex64, vec_len)
+        )
+
+        # The synthesis filter runs on the same polyphase engine, with the synthesis bank
+        bank = partial(polyphase.synthesis_bank, vec_len, num_taps, synthesis_taps=synthesis_taps)
+        self.engine = polyphase.PolyphaseFilter(vec_len, synthesis_taps, window, bank=bank)
+
+    def set_window_type(self, window):
+        """
+        Change the window type of the analysis PFB being inverted.
+
+        Args:
+            window (str or tuple): Window type ('hanning', 'hamming', 'blackman_harris', 'kaiser', 'chebyshev',
+                optionally with its parameter, or a registered custom prototype name).
+        """
+        # Built off the scheduler thread and swapped in at the next frame boundary
+        self.engine.set_window(window, background=True)
+
+    def work(self, input_items, output_items):
+        """
+        Transform the spectra back to filtered frames and apply the synthesis filter.
+
+        Args:
+            input_items: List of input arrays (input buffer).
+            output_items: List of output arrays (output buffer).
+
+        Returns:
+            int: Number of output vectors.
+        """
+        in0 = input_items[0]
+        out0 = output_items[0]
+
+        spectra = np.fft.ifftshift(in0, axes=1) if self.shifted else in0
+        self.engine.process(np.fft.ifft(spectra, axis=1), out0)
+
+        return len(out0)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 Mathias Huyghe.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import numpy as np
+from gnuradio import gr
+
+
+class MultiIntegration(gr.basic_block):
+    """
+    GNU Radio block for vector integration at several cadences at once.
+    Output port k emits the average of every cadences[k] input vectors. The
+    accumulator is hierarchical: the sums of the shortest cadence are built from
+    the input vectors, and each longer cadence from the sums of the previous one,
+    so every input vector is summed only once. Each cadence must be a multiple of
+    the previous one (e.g. 1 s quick-look, 10 s science and 60 s archive spectra).
+    Cadences given in seconds are rounded to input vectors: the first one to the
+    nearest count, each longer one to the nearest multiple of the previous count.
+    The effective cadences, in seconds, are kept in self.durations.
+    """
+
+    def __init__(self, vec_len, cadences, samp_rate=0, nb_accumulation=1):
+        """
+        Initializes the block with vector size and cadences.
+
+        Args:
+            vec_len (int): Length of input and output vectors.
+            cadences (list): Integration lengths in increasing order, one per output port,
+                in seconds when samp_rate is given, in input vectors otherwise.
+            samp_rate (float): Sampling rate of the signal, 0 to give the cadences in input vectors.
+            nb_accumulation (int): Number of spectra already summed per input vector upstream.
+        """
+        frame_duration = vec_len * max(1, nb_accumulation) / samp_rate if samp_rate > 0 else 0
+        if frame_duration:
+            # A frame duration rarely divides the cadences: round each one to a multiple
+            # of the previous count (e.g. 38, 380, 2280 vectors for 1, 10 and 60 s)
+            counts = []
+            for cadence in cadences:
+                lower = counts[-1] if counts else 1
+                counts.append(lower * max(1, int(round(cadence / (frame_duration * lower)))))
+        else:
+            counts = [max(1, int(cadence)) for cadence in cadences]
+        if not counts:
+            raise ValueError("At least one cadence is needed")
+        for shorter, longer in zip(counts, counts[1:]):
+            if longer % shorter:
+                raise ValueError(f"Each cadence must be a multiple of the previous one: {counts}")
+
+        gr.basic_block.__init__(self,
+                                name="MultiIntegration",
+                                in_sig=[(np.float32, int(vec_len))],  # Input: vector of float32
+                                out_sig=[(np.float32, int(vec_len))] * len(counts))  # One output per cadence
+        self.set_relative_rate(1.0 / counts[0])  # Rate of the shortest cadence, the fastest output
+
+        self.vec_len = vec_len
+        self.cadences = counts  # Integration lengths in input vectors
+        self.durations = [count * frame_duration for count in counts]  # Effective cadences (s), 0 without samp_rate
+        # Number of lower-level sums in each sum of a level (input vectors for the first level)
+        self.group_sizes = [counts[0]] + [longer // shorter for shorter, longer in zip(counts, counts[1:])]
+        self.count = 0  # Input vectors integrated since the last output of the longest cadence
+        # Partial sum of each level (float64, the longest cadences sum many vectors)
+        self.accumulators = np.zeros((len(counts), vec_len), dtype=np.float64)
+
+    def forecast(self, noutput_items, ninputs):
+        """
+        Number of input vectors needed to produce noutput_items averages of the shortest cadence.
+        """
+        required = max(1, noutput_items * self.cadences[0] - self.count % self.cadences[0])
+        return [required] * ninputs
+
+    def general_work(self, input_items, output_items):
+        """
+        Main method for processing data.
+
+        Args:
+            input_items (list): List of input arrays. Shape: (N, vec_len).
+            output_items (list): List of output arrays, one per cadence. Shape: (M, vec_len).
+
+        Returns:
+            int: gr.WORK_CALLED_PRODUCE, the output counts are given per port.
+        """
+        in0 = input_items[0]
+
+        # Consume everything, unless an output buffer cannot hold its results
+        num_frames = len(in0)
+        for out, cadence in zip(output_items, self.cadences):
+            num_frames = min(num_frames, max(0, len(out) * cadence - self.count % cadence))
+        self.consume(0, num_frames)
+
+        values = in0[:num_frames]
+        lower = 1  # Cadence of the values, in input vectors
+        for level, (out, cadence) in enumerate(zip(output_items, self.cadences)):
+            filled = (self.count % cadence) // lower  # Values already in the partial sum
+            sums = self.level_sums(values, self.accumulators[level], filled, self.group_sizes[level])
+            np.divide(sums, cadence, out=out[:len(sums)], casting="same_kind")
+            self.produce(level, len(sums))
+            # The completed sums feed the next level
+            values = sums
+            lower = cadence
+
+        self.count = (self.count + num_frames) % self.cadences[-1]
+        return gr.WORK_CALLED_PRODUCE
+
+    def level_sums(self, values, accumulator, filled, group):
+        """
+        Sums of every group of values completed by this call.
+
+        Args:
+            values (np.ndarray): Input vectors or lower-level sums, shape (N, vec_len).
+            accumulator (np.ndarray): Partial sum of the running group, updated in place.
+            filled (int): Number of values already in the partial sum.
+            group (int): Number of values per sum.
+
+        Returns:
+            np.ndarray: Completed sums, shape (K, vec_len).
+        """
+        needed = group - filled
+        if len(values) < needed:
+            accumulator += np.sum(values, axis=0, dtype=np.float64)
+            return np.empty((0, self.vec_len), dtype=np.float64)
+
+        nb_groups = (len(values) - needed) // group
+        sums = np.empty((1 + nb_groups, self.vec_len), dtype=np.float64)
+
+        # Complete the running group with the first values of the buffer
+        np.add(accumulator, np.sum(values[:needed], axis=0, dtype=np.float64), out=sums[0])
+
+        # Every further complete group gives one more sum
+        rest = values[needed:]
+        grouped = rest[:nb_groups * group].reshape(nb_groups, group, self.vec_len)
+        np.sum(grouped, axis=1, dtype=np.float64, out=sums[1:])
+
+        # Keep only the incomplete remainder in the accumulator
+        np.sum(rest[nb_groups * group:], axis=0, dtype=np.float64, out=accumulator)
+        return sums
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 Mathias Huyghe.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import math
+
+import numpy as np
+from gnuradio import gr
+
+from . import polyphase
+
+
+class OversampledPFB(gr.basic_block):
+    """
+    Oversampled Polyphase Filter Bank.
+
+    Same filter as PFB, but an output frame is produced every vec_len / oversampling
+    input samples instead of every vec_len samples (e.g. oversampling = 2 or 4/3),
+    giving a flatter channel response and less scalloping.
+
+    Args:
+        vec_len (int): Length of the input vector.
+        window (str or tuple): Window type ('hanning', 'hamming', 'blackman_harris', 'kaiser', 'chebyshev',
+                optionally with its parameter, or a registered custom prototype name).
+        num_taps (int): Number of taps in the filter.
+        oversampling (float): Oversampling factor, vec_len / oversampling must be an integer.
+        precision (str): Storage precision of taps and history ('float32' or 'float64').
+    """
+
+    def __init__(self, vec_len, window, num_taps, oversampling, precision="float32"):
+        """
+        Initialize the oversampled Polyphase Filter Bank block.
+
+        Args:
+            vec_len (int): Length of the input vector.
+            window (str or tuple): Window type ('hanning', 'hamming', 'blackman_harris', 'kaiser', 'chebyshev',
+                optionally with its parameter, or a registered custom prototype name).
+            num_taps (int): Number of taps in the filter.
+            oversampling (float): Oversampling factor, vec_len / oversampling must be an integer.
+            precision (str): Storage precision of taps and history ('float32' or 'float64').
+        """
+        hop = int(round(vec_len / oversampling))
+        if oversampling < 1 or not math.isclose(vec_len / oversampling, hop):
+            raise ValueError(f"vec_len / oversampling must be an integer hop <= vec_len, got {vec_len / oversampling}")
+
+        self.vec_len = vec_len
+        self.num_taps = num_taps
+        self.hop = hop
+
+        gr.basic_block.__init__(
+            self,
+            name="OversampledPFB",
+            in_sig=[(np.complex64, vec_len)],  # Input signal type (complex64, vec_len)
+            out_sig=[(np.complex64, vec_len)],  # Output signal type (complex64, vec_len)
+        )
+        self.set_relative_rate(vec_len / hop)
+        # One more input frame gives up to ceil(vec_len / hop) output frames: a smaller
+        # output buffer could never take a frame and the block would stall
+        self.set_output_multiple(-(-vec_len // hop))
+
+        self.engine = polyphase.PolyphaseFilter(vec_len, num_taps, window, precision)
+        self.engine.set_hop(hop)
+
+    def set_window_type(self, window):
+        """
+        Change the window type and update filter coefficients.
+
+        Args:
+            window (str or tuple): Window type ('hanning', 'hamming', 'blackman_harris', 'kaiser', 'chebyshev',
+                optionally with its parameter, or a registered custom prototype name).
+        """
+        # Built off the scheduler thread and swapped in at the next frame boundary
+        self.engine.set_window(window, background=True)
+
+    def forecast(self, noutput_items, ninputs):
+        """
+        Number of input vectors needed to produce noutput_items output vectors.
+        """
+        required = max(1, -(-noutput_items * self.hop // self.vec_len))
+        return [required] * ninputs
+
+    def general_work(self, input_items, output_items):
+        """
+        Process input vectors and produce vec_len / hop output vectors per input vector.
+
+        Args:
+            input_items: List of input arrays (input buffer).
+            output_items: List of output arrays (output buffer).
+
+        Returns:
+            int: Number of output vectors produced.
+        """
+        in0 = input_items[0]
+        out0 = output_items[0]
+
+        # Only consume what fits in the output buffer
+        num_frames = min(len(in0), self.engine.frames_for_outputs(len(out0)))
+        produced = self.engine.process_oversampled(in0[:num_frames], out0)
+
+        self.consume(0, num_frames)
+        return produced
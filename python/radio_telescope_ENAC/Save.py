@@ -11,18 +11,25 @@ from datetime import datetime
 import numpy as np
 from gnuradio import gr
 
+from . import kurtosis
+
 
 class Save(gr.sync_block):
     """
     A GNU Radio block that saves data to a binary file,
     with the option to start/stop recording based on input toggle.
+    With a spectral kurtosis threshold, a second input takes the spectral kurtosis
+    from Integration and the channels flagged as RFI are saved as NaN.
     """
 
-    def __init__(self, vec_len, azimuth, elevation, toggle, samp_rate):
+    def __init__(self, vec_len, azimuth, elevation, toggle, samp_rate, sk_threshold=0):
         # Initialize the block with necessary parameters
+        in_sig = [(np.float32, vec_len)]  # Input signal type (vector of float32)
+        if sk_threshold > 0:
+            in_sig.append((np.float32, vec_len))  # Spectral kurtosis used as RFI mask
         gr.sync_block.__init__(self,
                                name="Save",  # Name of the block
-                               in_sig=[(np.float32, vec_len)],  # Input signal type (vector of float32)
+                               in_sig=in_sig,
                                out_sig=None)  # No output signal
 
         self.vec_len = vec_len
@@ -30,6 +37,7 @@ class Save(gr.sync_block):
         self.elevation = elevation
         self.toggle = toggle  # Toggle to control start/stop of recording
         self.samp_rate = samp_rate  # Sampling rate
+        self.sk_threshold = sk_threshold  # Tolerance |SK - 1| of the RFI mask, 0 to disable
         self.filename = None  # Filename for saving data
         self.file = None  # File object for writing data
         self.buffer = []  # Temporary buffer to store incoming data
@@ -92,7 +100,11 @@ class Save(gr.sync_block):
             return 0
 
         in0 = input_items[0]  # Get the input signal
-        self.buffer.extend(in0[:, self.indx])  # Add selected frequency data to the buffer
+        data = in0[:, self.indx]
+        if self.sk_threshold > 0:
+            # Blank the channels flagged by the spectral kurtosis
+            data[kurtosis.mask(input_items[1][:, self.indx], self.sk_threshold)] = np.nan
+        self.buffer.extend(data)  # Add selected frequency data to the buffer
 
         # Save the data in the buffer to the file if it reaches a certain size
         if len(self.buffer) > 1000:  # Adjust buffer threshold as needed
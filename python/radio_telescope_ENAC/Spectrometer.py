@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 Mathias Huyghe.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import numpy as np
+from gnuradio import gr
+
+from . import polyphase
+from .fft_backends import BatchFFT
+
+
+class Spectrometer(gr.decim_block):
+    """
+    Fused PFB spectrometer block.
+    Applies the polyphase weighting, the FFT, the 1/vec_len normalization,
+    the squared magnitude and a pre-accumulation of nb_accumulation spectra
+    in a single work call, replacing the PFB -> fft_vcc -> multiply_const_cc ->
+    complex_to_mag_squared -> integrate_ff chain.
+    """
+
+    def __init__(self, vec_len, window, num_taps, nb_accumulation, precision="float32",
+                 fft_backend="numpy", nthreads=1, wisdom_file=""):
+        """
+        Initializes the Spectrometer block.
+
+        Args:
+            vec_len (int): Length of input vectors (number of channels).
+            window (str or tuple): Window type ('hanning', 'hamming', 'blackman_harris', 'kaiser', 'chebyshev',
+                optionally with its parameter, or a registered custom prototype name).
+            num_taps (int): Number of taps in the polyphase filter.
+            nb_accumulation (int): Number of power spectra summed per output vector.
+            precision (str): Working precision ('float32' or 'float64').
+            fft_backend (str): FFT backend ('numpy', 'scipy', 'pyfftw').
+            nthreads (int): Number of FFT threads for the 'scipy' and 'pyfftw' backends.
+            wisdom_file (str): FFTW wisdom file of the 'pyfftw' backend, loaded at startup
+                and saved when the flowgraph stops ("" for none).
+        """
+        self.nb_accumulation = max(1, int(nb_accumulation))
+        gr.decim_block.__init__(self,
+                                name="Spectrometer",  # Name of the block
+                                in_sig=[(np.complex64, int(vec_len))],  # Input: vector of complex64
+                                out_sig=[(np.float32, int(vec_len))],  # Output: vector of float32
+                                decim=self.nb_accumulation)  # One output per nb_accumulation inputs
+
+        self.vec_len = vec_len
+        self.num_taps = num_taps
+        self.scale = 1.0 / vec_len  # FFT normalization (multiply_const_cc(1/vec_len))
+        self.engine = polyphase.PolyphaseFilter(vec_len, num_taps, window, precision)
+        self.fft = BatchFFT(vec_len, fft_backend, nthreads, wisdom_file)
+
+        # Scratch arrays, grown on demand and reused between work calls
+        self.filtered = np.zeros((0, vec_len), dtype=self.engine.complex_dtype)
+        self.power = np.zeros((0, vec_len), dtype=self.engine.real_dtype)
+        self.accumulated = np.zeros((0, vec_len), dtype=self.engine.real_dtype)
+
+    def set_window_type(self, window):
+        """
+        Change the window type of the polyphase filter.
+
+        Args:
+            window (str or tuple): Window type ('hanning', 'hamming', 'blackman_harris', 'kaiser', 'chebyshev',
+                optionally with its parameter, or a registered custom prototype name).
+        """
+        # Built off the scheduler thread and swapped in at the next frame boundary
+        self.engine.set_window(window, background=True)
+
+    def stop(self):
+        """ Saves the FFTW wisdom gathered while running. """
+        self.fft.save_wisdom()
+        return True
+
+    def reserve(self, num_frames, num_outputs):
+        """
+        Make sure the scratch arrays can hold a block of num_frames input vectors.
+
+        Args:
+            num_frames (int): Number of input vectors in the work call.
+            num_outputs (int): Number of output vectors in the work call.
+        """
+        if self.filtered.shape[0] < num_frames:
+            self.filtered = np.zeros((num_frames, self.vec_len), dtype=self.engine.complex_dtype)
+            self.power = np.zeros((num_frames, self.vec_len), dtype=self.engine.real_dtype)
+        if self.accumulated.shape[0] < num_outputs:
+            self.accumulated = np.zeros((num_outputs, self.vec_len), dtype=self.engine.real_dtype)
+
+    def work(self, input_items, output_items):
+        """
+        Main method for processing data.
+
+        Args:
+            input_items (list): List of input arrays. Shape: (N * nb_accumulation, vec_len).
+            output_items (list): List of output arrays. Shape: (N, vec_len).
+
+        Returns:
+            int: Number of output vectors produced.
+        """
+        out = output_items[0]
+        num_outputs = out.shape[0]
+        num_frames = num_outputs * self.nb_accumulation
+        in0 = input_items[0][:num_frames]
+
+        self.reserve(num_frames, num_outputs)
+        filtered = self.filtered[:num_frames]
+        power = self.power[:num_frames]
+        accumulated = self.accumulated[:num_outputs]
+
+        # Polyphase weighting of every frame of the buffer
+        self.engine.process(in0, filtered)
+
+        # FFT of all frames at once, then normalized squared magnitude
+        spectrum = self.fft(filtered)
+        np.multiply(spectrum.real, spectrum.real, out=power)
+        power += np.square(spectrum.imag)
+        power *= self.scale * self.scale
+
+        # Pre-accumulation: sum each group of nb_accumulation spectra
+        np.sum(power.reshape(num_outputs, self.nb_accumulation, self.vec_len), axis=1, out=accumulated)
+
+        # fftshift applied on the accumulated spectra only (shift commutes with the sum)
+        half = self.vec_len // 2
+        out[:, half:] = accumulated[:, :self.vec_len - half]
+        out[:, :half] = accumulated[:, self.vec_len - half:]
+
+        return num_outputs
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 Mathias Huyghe.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import numpy as np
+from gnuradio import gr
+
+from . import polyphase
+from .fft_backends import BatchFFT
+
+
+class ZoomSpectrometer(gr.decim_block):
+    """
+    Zoom PFB spectrometer block.
+    Channelizes the input with the polyphase filter bank and FFT, keeps only a band
+    of num_channels coarse channels, and runs a second FFT of zoom_len points over
+    successive frames of each kept channel. Each output vector holds the
+    num_channels * zoom_len fine channels, coarse channel major, both axes in
+    shifted (increasing frequency) order, summed over nb_accumulation zoom spectra.
+    """
+
+    def __init__(self, vec_len, window, num_taps, first_channel, num_channels, zoom_len,
+                 nb_accumulation, precision="float32", fft_backend="numpy", nthreads=1, wisdom_file=""):
+        """
+        Initializes the ZoomSpectrometer block.
+
+        Args:
+            vec_len (int): Length of input vectors (number of coarse channels).
+            window (str or tuple): Window type ('hanning', 'hamming', 'blackman_harris', 'kaiser', 'chebyshev',
+                optionally with its parameter, or a registered custom prototype name).
+            num_taps (int): Number of taps in the polyphase filter.
+            first_channel (int): First kept coarse channel, in shifted order.
+            num_channels (int): Number of kept coarse channels.
+            zoom_len (int): Size of the second FFT (fine channels per coarse channel).
+            nb_accumulation (int): Number of zoom spectra summed per output vector.
+            precision (str): Working precision ('float32' or 'float64').
+            fft_backend (str): FFT backend of the coarse and fine FFTs ('numpy', 'scipy', 'pyfftw').
+            nthreads (int): Number of FFT threads for the 'scipy' and 'pyfftw' backends.
+            wisdom_file (str): FFTW wisdom file of the 'pyfftw' backend, loaded at startup
+                and saved when the flowgraph stops ("" for none).
+        """
+        if not 0 <= first_channel < first_channel + num_channels <= vec_len:
+            raise ValueError(f"Coarse channels [{first_channel}, {first_channel + num_channels}[ "
+                             f"are outside [0, {vec_len}[")
+
+        self.zoom_len = max(1, int(zoom_len))
+        self.nb_accumulation = max(1, int(nb_accumulation))
+        self.num_channels = int(num_channels)
+        gr.decim_block.__init__(self,
+                                name="ZoomSpectrometer",  # Name of the block
+                                in_sig=[(np.complex64, int(vec_len))],  # Input: vector of complex64
+                                out_sig=[(np.float32, self.num_channels * self.zoom_len)],  # Fine spectrum
+                                decim=self.zoom_len * self.nb_accumulation)
+
+        self.vec_len = vec_len
+        self.num_taps = num_taps
+        self.first_channel = first_channel
+        # Unshifted FFT bins of the kept coarse channels (shifted index i is bin i - vec_len // 2)
+        self.channels = (np.arange(first_channel, first_channel + num_channels) - vec_len // 2) % vec_len
+        self.scale = 1.0 / (vec_len * self.zoom_len)  # Normalization of both FFTs
+        self.engine = polyphase.PolyphaseFilter(vec_len, num_taps, window, precision)
+        self.fft = BatchFFT(vec_len, fft_backend, nthreads, wisdom_file)
+        self.fine_fft = BatchFFT(self.zoom_len, fft_backend, nthreads, wisdom_file)
+
+        # Scratch array, grown on demand and reused between work calls
+        self.filtered = np.zeros((0, vec_len), dtype=self.engine.complex_dtype)
+
+    @staticmethod
+    def channel_range(vec_len, sample_rate, center_freq, freq_min, freq_max):
+        """
+        Coarse channels (in shifted order) whose center frequency lies in ]freq_min, freq_max[.
+
+        Args:
+            vec_len (int): Number of coarse channels.
+            sample_rate (float): Sampling rate of the signal.
+            center_freq (float): Center frequency of the band.
+            freq_min (float): Lower frequency bound.
+            freq_max (float): Upper frequency bound.
+
+        Returns:
+            tuple: (first_channel, num_channels).
+        """
+        freq = center_freq + np.fft.fftshift(np.fft.fftfreq(vec_len, 1 / sample_rate))
+        indx = np.where((freq > freq_min) & (freq < freq_max))[0]
+        if len(indx) == 0:
+            raise ValueError(f"No coarse channel between {freq_min} and {freq_max} Hz")
+        return int(indx[0]), len(indx)
+
+    def set_window_type(self, window):
+        """
+        Change the window type of the polyphase filter.
+
+        Args:
+            window (str or tuple): Window type ('hanning', 'hamming', 'blackman_harris', 'kaiser', 'chebyshev',
+                optionally with its parameter, or a registered custom prototype name).
+        """
+        # Built off the scheduler thread and swapped in at the next frame boundary
+        self.engine.set_window(window, background=True)
+
+    def stop(self):
+        """ Saves the FFTW wisdom gathered while running (shared by both FFTs). """
+        self.fft.save_wisdom()
+        return True
+
+    def work(self, input_items, output_items):
+        """
+        Main method for processing data.
+
+        Args:
+            input_items (list): List of input arrays. Shape: (N * zoom_len * nb_accumulation, vec_len).
+            output_items (list): List of output arrays. Shape: (N, num_channels * zoom_len).
+
+        Returns:
+            int: Number of output vectors produced.
+        """
+        out = output_items[0]
+        num_outputs = out.shape[0]
+        num_zooms = num_outputs * self.nb_accumulation
+        num_frames = num_zooms * self.zoom_len
+        in0 = input_items[0][:num_frames]
+
+        if self.filtered.shape[0] < num_frames:
+            self.filtered = np.zeros((num_frames, self.vec_len), dtype=self.engine.complex_dtype)
+        filtered = self.filtered[:num_frames]
+
+        # Coarse channelization of every frame, then keep only the selected band
+        self.engine.process(in0, filtered)
+        coarse = self.fft(filtered)[:, self.channels]
+
+        # Fine FFT along time for each kept channel, one row per (zoom, channel)
+        series = coarse.reshape(num_zooms, self.zoom_len, self.num_channels).transpose(0, 2, 1)
+        fine = self.fine_fft(np.ascontiguousarray(series).reshape(-1, self.zoom_len))
+        power = np.square(fine.real)
+        power += np.square(fine.imag)
+
+        # Pre-accumulation, then fine axis in shifted order, coarse channel major
+        accumulated = power.reshape(num_outputs, self.nb_accumulation, self.num_channels, self.zoom_len).sum(axis=1)
+        accumulated = np.fft.fftshift(accumulated, axes=2)
+        np.multiply(accumulated.reshape(num_outputs, -1), self.scale * self.scale, out=out)
+
+        return num_outputs
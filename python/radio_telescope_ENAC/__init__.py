@@ -27,3 +27,10 @@ from .Save import Save
 from .Gaussian_fit import Gaussian_fit
 from .Gausian_Signal import Gausian_Signal
 #
+from .Spectrometer import Spectrometer
+from .FFT import FFT
+from .OversampledPFB import OversampledPFB
+from .ZoomSpectrometer import ZoomSpectrometer
+from .InversePFB import InversePFB
+from .MultiIntegration import MultiIntegration
+from .Baseline import Baseline
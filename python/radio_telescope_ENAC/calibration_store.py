@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 Mathias Huyghe.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import glob
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+FORMAT_VERSION = 1
+# Rows of a stored solution
+FIELDS = ("hot_spectrum", "cold_spectrum", "Tsys", "Gsys")
+
+
+class CalibrationStore:
+    """
+    Directory of calibration solutions saved as .npy files, one per solution.
+
+    Each file holds the hot and cold spectra, Tsys and Gsys stacked in a
+    (4, vec_len) float64 array. The file name carries the format version, vec_len,
+    the sample rate and the UTC time of the solution, so that loading only
+    considers solutions of the current setup and sorts them by time. Files are
+    written to a temporary name and renamed, a crash never leaves a partial
+    solution, and they are loaded memory-mapped.
+
+    Args:
+        directory (str): Directory of the solutions, created if needed.
+        vec_len (int): Number of channels.
+        sample_rate (float): Sampling rate of the signal.
+        keep (int): Number of solutions kept for this setup, the oldest are removed (0 keeps all).
+    """
+
+    def __init__(self, directory, vec_len, sample_rate, keep=10):
+        self.directory = directory
+        self.vec_len = vec_len
+        self.sample_rate = sample_rate
+        self.keep = keep
+        os.makedirs(directory, exist_ok=True)
+        self.prefix = f"calibration_v{FORMAT_VERSION}_n{vec_len}_sr{int(round(sample_rate))}_"
+
+    def paths(self):
+        """ Solution files of this setup, oldest first. """
+        return sorted(glob.glob(os.path.join(self.directory, self.prefix + "*.npy")))
+
+    def save(self, hot_spectrum, cold_spectrum, Tsys, Gsys, timestamp=None):
+        """
+        Saves a calibration solution.
+
+        Args:
+            hot_spectrum (np.ndarray): Spectrum measured in "Hot" mode.
+            cold_spectrum (np.ndarray): Spectrum measured in "Cold" mode.
+            Tsys (np.ndarray): System temperature (Kelvin).
+            Gsys (np.ndarray): System gain.
+            timestamp (datetime): Time of the solution, now by default.
+
+        Returns:
+            str: Path of the solution file.
+        """
+        timestamp = timestamp or datetime.now(timezone.utc)
+        path = os.path.join(self.directory, self.prefix + timestamp.strftime("%Y%m%dT%H%M%S_%f") + ".npy")
+        solution = np.stack([hot_spectrum, cold_spectrum, Tsys, Gsys]).astype(np.float64)
+
+        # Write then rename, so that a solution file is always complete
+        with open(path + ".tmp", "wb") as file:
+            np.save(file, solution)
+        os.replace(path + ".tmp", path)
+
+        if self.keep > 0:
+            for old in self.paths()[:-self.keep]:
+                os.remove(old)
+        return path
+
+    def load(self, path):
+        """
+        Memory-maps a solution file.
+
+        Args:
+            path (str): Path of the solution file.
+
+        Returns:
+            dict: Solution arrays keyed by FIELDS, copy-on-write views of the file,
+            or None when the file is not a valid solution.
+        """
+        try:
+            solution = np.load(path, mmap_mode="c")
+        except (OSError, ValueError):
+            return None
+        if solution.shape != (len(FIELDS), self.vec_len) or not np.all(np.isfinite(solution)):
+            return None
+        return dict(zip(FIELDS, solution))
+
+    def latest(self):
+        """
+        Most recent valid solution of this setup.
+
+        Returns:
+            dict: Solution arrays keyed by FIELDS, or None when there is none.
+        """
+        for path in reversed(self.paths()):
+            solution = self.load(path)
+            if solution is not None:
+                return solution
+        return None
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 Mathias Huyghe.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import numpy as np
+from scipy.ndimage import median_filter
+
+# Default reference band, as a fraction of the channels: channels 2541 to 2786 of
+# the original 4096-channel setup
+DEFAULT_REFERENCE_BAND = (2541 / 4096, 2786 / 4096)
+
+
+def reference_channels(vec_len, reference_band=None):
+    """
+    Channels of the reference band used for the spike threshold.
+
+    Args:
+        vec_len (int): Number of channels.
+        reference_band (tuple): (first, last) channel indices, last excluded, or None
+            for the default band scaled to vec_len.
+
+    Returns:
+        slice: Reference channels.
+    """
+    if reference_band is None:
+        first = int(round(DEFAULT_REFERENCE_BAND[0] * vec_len))
+        last = int(round(DEFAULT_REFERENCE_BAND[1] * vec_len))
+    else:
+        first, last = (int(channel) for channel in reference_band)
+    if not 0 <= first < last <= vec_len:
+        raise ValueError(f"Invalid reference band ({first}, {last}) for {vec_len} channels")
+    return slice(first, last)
+
+
+def despike(spectra, reference, threshold=1.2, window=21, out=None):
+    """
+    Replaces the channels above threshold times the mean of the reference band by
+    the median of their neighbours.
+
+    The running median is computed on every channel at once, so the cost does not
+    depend on the number of spikes.
+
+    Args:
+        spectra (np.ndarray): Spectra, shape (vec_len,) or (N, vec_len).
+        reference (slice): Reference channels, see reference_channels().
+        threshold (float): Spike threshold relative to the reference level.
+        window (int): Length of the running median, in channels.
+        out (np.ndarray): Optional output array, may be spectra itself.
+
+    Returns:
+        np.ndarray: Despiked spectra.
+    """
+    spectra = np.asarray(spectra)
+    level = np.mean(spectra[..., reference], axis=-1, keepdims=True)
+    # Running median along the channel axis only, edges extended with the last channel
+    size = (1,) * (spectra.ndim - 1) + (window,)
+    medians = median_filter(spectra, size=size, mode="nearest")
+    spikes = spectra > threshold * level
+    if out is None:
+        return np.where(spikes, medians, spectra)
+    np.copyto(out, spectra, casting="same_kind")
+    np.copyto(out, medians, where=spikes, casting="same_kind")
+    return out
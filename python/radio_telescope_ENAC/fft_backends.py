@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 Mathias Huyghe.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import os
+import pickle
+import threading
+
+import numpy as np
+
+try:
+    import scipy.fft as scipy_fft
+except ImportError:  # scipy is optional for this module
+    scipy_fft = None
+
+try:
+    import pyfftw
+    import pyfftw.builders
+except ImportError:  # pyFFTW is optional
+    pyfftw = None
+
+BACKENDS = ("numpy", "scipy", "pyfftw")
+
+# Frames transformed per execution of an FFTW plan: one plan serves every block size
+PLAN_BATCH = 16
+
+
+class BatchFFT:
+    """
+    Forward FFT of a block of frames along the channel axis, with a choice of backend.
+
+    'numpy' uses np.fft (single-threaded), 'scipy' uses scipy.fft with `workers`
+    threads and 'pyfftw' uses one FFTW plan per dtype, for batches of PLAN_BATCH
+    frames, executed as many times as needed. The first call plans with
+    FFTW_ESTIMATE and a measured plan is built in a background thread, then
+    swapped in at a later call, so no measurement runs on the caller's thread.
+    Wisdom is loaded from wisdom_file at construction and only written back by
+    save_wisdom(). With pyFFTW the returned array is reused by the next call.
+
+    Args:
+        vec_len (int): FFT size.
+        backend (str): FFT backend ('numpy', 'scipy', 'pyfftw').
+        nthreads (int): Number of threads for the 'scipy' and 'pyfftw' backends.
+        wisdom_file (str): Optional pickle file used to load and save FFTW wisdom.
+    """
+
+    def __init__(self, vec_len, backend="numpy", nthreads=1, wisdom_file=None):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unsupported FFT backend: {backend}")
+        if backend == "scipy" and scipy_fft is None:
+            raise ImportError("The 'scipy' FFT backend requires scipy.")
+        if backend == "pyfftw" and pyfftw is None:
+            raise ImportError("The 'pyfftw' FFT backend requires pyFFTW.")
+
+        self.vec_len = vec_len
+        self.backend = backend
+        self.nthreads = max(1, int(nthreads))
+        self.wisdom_file = wisdom_file
+        self.lock = threading.Lock()
+        self.plans = {}  # Active FFTW plan per input dtype
+        self.measured = {}  # Measured plans staged by the background worker
+        self.worker = None
+        self.result = None  # pyFFTW output, grown on demand
+
+        if backend == "pyfftw" and wisdom_file and os.path.exists(wisdom_file):
+            with open(wisdom_file, "rb") as file:
+                pyfftw.import_wisdom(pickle.load(file))
+
+    def __call__(self, frames):
+        """
+        Compute the FFT of every frame.
+
+        Args:
+            frames (np.ndarray): Input frames, shape (N, vec_len).
+
+        Returns:
+            np.ndarray: Spectra, shape (N, vec_len).
+        """
+        if self.backend == "scipy":
+            return scipy_fft.fft(frames, axis=1, workers=self.nthreads)
+        elif self.backend == "pyfftw":
+            return self.batched(frames)
+        else:
+            return np.fft.fft(frames, axis=1)
+
+    def batched(self, frames):
+        """
+        Compute the FFT of every frame with the FFTW plan, PLAN_BATCH frames at a time.
+
+        Args:
+            frames (np.ndarray): Input frames, shape (N, vec_len).
+
+        Returns:
+            np.ndarray: Spectra, shape (N, vec_len), overwritten by the next call.
+        """
+        num_frames = frames.shape[0]
+        plan = self.plan(frames.dtype)
+        if self.result is None or self.result.shape[0] < num_frames or self.result.dtype != plan.output_array.dtype:
+            self.result = pyfftw.empty_aligned((num_frames, self.vec_len), dtype=plan.output_array.dtype)
+        result = self.result[:num_frames]
+
+        for first in range(0, num_frames, PLAN_BATCH):
+            count = min(PLAN_BATCH, num_frames - first)
+            # The rows past count hold stale frames of a previous batch, their spectra are dropped
+            plan.input_array[:count] = frames[first:first + count]
+            plan()
+            result[first:first + count] = plan.output_array[:count]
+        return result
+
+    def plan(self, dtype):
+        """
+        Return the FFTW plan for frames of the given dtype, creating it if needed.
+
+        Args:
+            dtype (np.dtype): Dtype of the input frames.
+
+        Returns:
+            pyfftw.FFTW: Plan transforming (PLAN_BATCH, vec_len) arrays along axis 1.
+        """
+        if self.measured:
+            with self.lock:
+                self.plans.update(self.measured)
+                self.measured.clear()
+
+        plan = self.plans.get(dtype)
+        if plan is None:
+            # Estimated plan for now (it also uses any measured wisdom already loaded)
+            plan = self.build(dtype, "FFTW_ESTIMATE")
+            self.plans[dtype] = plan
+            self.worker = threading.Thread(target=self.measure, args=(dtype,), daemon=True)
+            self.worker.start()
+        return plan
+
+    def build(self, dtype, planner_effort):
+        """
+        Plan the FFT of PLAN_BATCH frames along axis 1.
+
+        Args:
+            dtype (np.dtype): Dtype of the input frames.
+            planner_effort (str): FFTW planner flag.
+
+        Returns:
+            pyfftw.FFTW: New plan with its own aligned arrays.
+        """
+        template = pyfftw.zeros_aligned((PLAN_BATCH, self.vec_len), dtype=dtype)
+        return pyfftw.builders.fft(template, axis=1, threads=self.nthreads, planner_effort=planner_effort)
+
+    def measure(self, dtype):
+        """
+        Build a measured plan and stage it for the next call.
+
+        Args:
+            dtype (np.dtype): Dtype of the input frames.
+        """
+        plan = self.build(dtype, "FFTW_MEASURE")
+        with self.lock:
+            self.measured[dtype] = plan
+
+    def wait(self):
+        """ Block until the background worker, if any, has staged its measured plan. """
+        worker = self.worker
+        if worker is not None:
+            worker.join()
+
+    def save_wisdom(self):
+        """ Write the accumulated FFTW wisdom to wisdom_file, if one was given. """
+        if self.backend == "pyfftw" and self.wisdom_file:
+            with open(self.wisdom_file, "wb") as file:
+                pickle.dump(pyfftw.export_wisdom(), file)
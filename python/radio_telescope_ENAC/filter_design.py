@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 Mathias Huyghe.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import numpy as np
+
+try:
+    from scipy.signal import windows as scipy_windows
+except ImportError:  # scipy is only needed for Dolph-Chebyshev windows
+    scipy_windows = None
+
+# Built-in window names, with the default parameter of the parametric ones
+WINDOWS = ("hanning", "hamming", "blackman_harris", "kaiser", "chebyshev")
+DEFAULT_PARAMETERS = {
+    "kaiser": 8.6,  # Kaiser beta
+    "chebyshev": 80.0,  # Dolph-Chebyshev sidelobe attenuation (dB)
+}
+
+# User prototypes registered with register_prototype(), keyed by name
+custom_prototypes = {}
+
+
+def blackman_harris(N):
+    """
+    Generate a Blackman-Harris window of size N.
+
+    Args:
+        N (int): Length of the window.
+
+    Returns:
+        np.ndarray: Blackman-Harris window coefficients.
+    """
+    n = np.arange(N)
+    a0 = 0.35875
+    a1 = 0.48829
+    a2 = 0.14128
+    a3 = 0.01168
+    # Calculate the Blackman-Harris window coefficients
+    return (
+            a0
+            - a1 * np.cos(2 * np.pi * n / (N - 1))
+            + a2 * np.cos(4 * np.pi * n / (N - 1))
+            - a3 * np.cos(6 * np.pi * n / (N - 1))
+    )
+
+
+def parse_window(window):
+    """
+    Split a window specification into its name and parameter.
+
+    A specification is a name ('hamming', 'kaiser', a registered custom name...)
+    or a (name, parameter) tuple such as ('kaiser', 10.0) or ('chebyshev', 100.0).
+
+    Args:
+        window (str or tuple): Window specification.
+
+    Returns:
+        tuple: (name, parameter), parameter being None for non-parametric windows.
+    """
+    if isinstance(window, (tuple, list)):
+        name, parameter = window
+    else:
+        name, parameter = window, None
+
+    if name in custom_prototypes:
+        return name, None
+    if name not in WINDOWS:
+        raise ValueError(f"Unsupported window type: {window}")
+    if name in DEFAULT_PARAMETERS:
+        return name, float(DEFAULT_PARAMETERS[name] if parameter is None else parameter)
+    return name, None
+
+
+def window_function(window, N):
+    """
+    Generate the coefficients of a built-in window.
+
+    Args:
+        window (str or tuple): Window specification (see parse_window).
+        N (int): Length of the window.
+
+    Returns:
+        np.ndarray: Window coefficients.
+    """
+    name, parameter = parse_window(window)
+    if name == "hanning":
+        return np.hanning(N)
+    elif name == "hamming":
+        return np.hamming(N)
+    elif name == "blackman_harris":
+        return blackman_harris(N)
+    elif name == "kaiser":
+        return np.kaiser(N, parameter)
+    elif name == "chebyshev":
+        if scipy_windows is None:
+            raise ImportError("Dolph-Chebyshev windows require scipy.")
+        return scipy_windows.chebwin(N, parameter)
+    else:
+        raise ValueError(f"{name} is a custom prototype, not a window")
+
+
+def prototype_filter(vec_len, num_taps, window):
+    """
+    Build the prototype filter of the polyphase filter bank.
+
+    Built-in windows give a windowed sinc; a registered custom name returns the
+    user array as is.
+
+    Args:
+        vec_len (int): Number of channels (length of one frame).
+        num_taps (int): Number of taps per channel.
+        window (str or tuple): Window specification (see parse_window).
+
+    Returns:
+        np.ndarray: Filter coefficients, shape (num_taps * vec_len,).
+    """
+    name, _ = parse_window(window)
+    if name in custom_prototypes:
+        prototype = custom_prototypes[name]
+        if len(prototype) != num_taps * vec_len:
+            raise ValueError(f"Custom prototype '{name}' has {len(prototype)} coefficients, "
+                             f"expected num_taps * vec_len = {num_taps * vec_len}")
+        return prototype
+
+    x = np.linspace(-num_taps / 2.0, num_taps / 2.0, num_taps * vec_len, endpoint=False)
+    return np.sinc(x) * window_function(window, len(x))
+
+
+def register_prototype(name, coefficients):
+    """
+    Register a user prototype filter so it can be used as a window name.
+
+    Args:
+        name (str): Name of the prototype, must not shadow a built-in window.
+        coefficients (np.ndarray): Prototype coefficients, shape (num_taps * vec_len,).
+    """
+    if name in WINDOWS:
+        raise ValueError(f"'{name}' is a built-in window")
+
+    prototype = np.array(coefficients, dtype=np.float64).reshape(-1)
+    prototype.setflags(write=False)
+    custom_prototypes[name] = prototype
+
+    # Tap banks built from a previous prototype of the same name are stale
+    from . import polyphase
+    polyphase.clear_tap_bank_cache()
+
+
+def filter_response(prototype, vec_len, passband=0.4, stopband=1.5, oversample=16):
+    """
+    Channel response figures of merit of a prototype filter.
+
+    The response is normalized to its DC gain; frequencies are in channel widths.
+
+    Args:
+        prototype (np.ndarray): Prototype coefficients, shape (num_taps * vec_len,).
+        vec_len (int): Number of channels.
+        passband (float): Passband edge, in channels from the channel center.
+        stopband (float): Stopband edge, in channels from the channel center.
+        oversample (int): Frequency grid points per channel.
+
+    Returns:
+        dict: 'passband_ripple_db' (peak-to-peak gain variation in the passband),
+        'stopband_attenuation_db' (attenuation of the highest stopband lobe) and
+        'edge_gain_db' (gain at half a channel from the center).
+    """
+    prototype = np.asarray(prototype, dtype=np.float64).reshape(-1)
+    length = vec_len * oversample
+    # Only the main lobe region and the near stopband matter: fold onto `length` points
+    padded = np.zeros(int(np.ceil(len(prototype) / length)) * length)
+    padded[:len(prototype)] = prototype
+    response = np.abs(np.fft.rfft(padded.reshape(-1, length).sum(axis=0)))
+    response /= response[0]
+
+    channels = np.arange(len(response)) / oversample
+    gain_db = 20 * np.log10(np.maximum(response, 1e-300))
+    in_passband = gain_db[channels <= passband]
+    return {
+        "passband_ripple_db": float(in_passband.max() - in_passband.min()),
+        "stopband_attenuation_db": float(-gain_db[channels >= stopband].max()),
+        "edge_gain_db": float(np.interp(0.5, channels, gain_db)),
+    }
+
+
+def design(vec_len, num_taps, window, **response_args):
+    """
+    Build a prototype filter and report its channel response.
+
+    Args:
+        vec_len (int): Number of channels.
+        num_taps (int): Number of taps per channel.
+        window (str or tuple): Window specification (see parse_window).
+        **response_args: Extra arguments of filter_response().
+
+    Returns:
+        tuple: (prototype coefficients, figures of merit dict).
+    """
+    prototype = prototype_filter(vec_len, num_taps, window)
+    return prototype, filter_response(prototype, vec_len, **response_args)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 Mathias Huyghe.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import numpy as np
+
+
+def estimator(s1, s2, nb_frames, nb_accumulation=1, shape=1.0, out=None):
+    """
+    Generalized spectral kurtosis (Nita & Gary 2010) from the power sums of a window.
+
+    Each of the nb_frames power values x summed in S1 = sum(x) and S2 = sum(x**2)
+    is itself the sum of nb_accumulation spectra. The estimator is 1 on Gaussian
+    noise and departs from 1 on non-Gaussian signals such as RFI bursts.
+
+    Args:
+        s1 (np.ndarray): Sum of the power values, per channel.
+        s2 (np.ndarray): Sum of the squared power values, per channel.
+        nb_frames (int or np.ndarray): Number of power values per sum (M).
+        nb_accumulation (int): Number of spectra summed in each power value (N).
+        shape (float): Shape factor d of the power distribution, 1 for power spectra of complex samples.
+        out (np.ndarray): Optional output array.
+
+    Returns:
+        np.ndarray: Spectral kurtosis estimator, NaN where it is undefined.
+    """
+    M = np.asarray(nb_frames, dtype=np.float64)
+    if M.ndim:
+        M = M.reshape(M.shape + (1,) * (np.ndim(s1) - M.ndim))  # One count per window
+    Nd = nb_accumulation * shape
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = M * s2 / np.square(s1) - 1.0
+        ratio *= (M * Nd + 1.0) / (M - 1.0)
+    if out is None:
+        return ratio
+    np.copyto(out, ratio, casting="same_kind")
+    return out
+
+
+def threshold(nb_frames, nb_accumulation=1, shape=1.0, sigma=3.0):
+    """
+    Symmetric tolerance |SK - 1| for a false alarm rate of about sigma standard deviations.
+
+    Args:
+        nb_frames (int): Number of power values per sum (M).
+        nb_accumulation (int): Number of spectra summed in each power value (N).
+        shape (float): Shape factor d of the power distribution.
+        sigma (float): Number of standard deviations.
+
+    Returns:
+        float: Tolerance around 1.
+    """
+    M = float(nb_frames)
+    MNd = M * nb_accumulation * shape
+    Nd = nb_accumulation * shape
+    # Variance of the estimator on Gaussian noise
+    variance = 2.0 * Nd * (Nd + 1.0) * M ** 2 / ((M - 1.0) * (MNd + 2.0) * (MNd + 3.0))
+    return sigma * np.sqrt(variance)
+
+
+def mask(sk, tolerance):
+    """
+    Channels flagged as RFI: estimator outside [1 - tolerance, 1 + tolerance] or undefined.
+
+    Args:
+        sk (np.ndarray): Spectral kurtosis estimator.
+        tolerance (float): Tolerance around 1.
+
+    Returns:
+        np.ndarray: Boolean mask, True on flagged channels.
+    """
+    return ~(np.abs(sk - 1.0) <= tolerance)
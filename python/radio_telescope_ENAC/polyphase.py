@@ -0,0 +1,433 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 Mathias Huyghe.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import math
+import threading
+from functools import lru_cache, partial
+
+import numpy as np
+
+from .filter_design import parse_window, prototype_filter
+
+# Maximum number of tap banks kept by the module-level cache
+TAP_BANK_CACHE_SIZE = 32
+
+# Storage dtypes (real taps, complex history) for each supported precision
+PRECISIONS = {
+    "float32": (np.float32, np.complex64),
+    "float64": (np.float64, np.complex128),
+}
+
+
+def tap_bank(vec_len, num_taps, window, precision="float32"):
+    """
+    Return the phase-reshaped polyphase coefficients, computed once per key.
+
+    Banks are kept in a module-level LRU cache shared by every PFB/Spectrometer
+    instance and by offline tools, so switching back to a window that was already
+    used costs a dictionary lookup. The returned array is read-only: callers must
+    not modify it in place.
+
+    Args:
+        vec_len (int): Number of channels (length of one frame).
+        num_taps (int): Number of taps per channel.
+        window (str or tuple): Window specification (see filter_design.parse_window).
+        precision (str): Coefficient precision ('float32' or 'float64').
+
+    Returns:
+        np.ndarray: Read-only coefficients, shape (num_taps, vec_len).
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unsupported precision: {precision}")
+
+    # Normalize the key so equivalent calls hit the same cache entry
+    return _cached_tap_bank(int(vec_len), int(num_taps), parse_window(window), precision)
+
+
+@lru_cache(maxsize=TAP_BANK_CACHE_SIZE)
+def _cached_tap_bank(vec_len, num_taps, window, precision):
+    real_dtype = PRECISIONS[precision][0]
+    taps = prototype_filter(vec_len, num_taps, window).astype(real_dtype).reshape(num_taps, vec_len)
+    taps.setflags(write=False)
+    return taps
+
+
+def clear_tap_bank_cache():
+    """ Drop every cached tap bank. """
+    _cached_tap_bank.cache_clear()
+    _cached_synthesis_bank.cache_clear()
+
+
+def synthesis_bank(vec_len, num_taps, window, synthesis_taps, regularization=1e-3, precision="float32"):
+    """
+    Return the inverse-PFB coefficients matching tap_bank(vec_len, num_taps, window).
+
+    Along the frame axis, each channel of the analysis PFB is a num_taps FIR filter.
+    Its Wiener-regularized inverse is truncated to synthesis_taps frames and delayed by
+    synthesis_taps // 2 frames, so that PolyphaseFilter.process() with this bank
+    rebuilds the input frames with that delay. The inversion is approximate: longer
+    banks give a more accurate reconstruction.
+
+    Args:
+        vec_len (int): Number of channels (length of one frame).
+        num_taps (int): Number of taps of the analysis filter.
+        window (str or tuple): Window specification (see filter_design.parse_window).
+        synthesis_taps (int): Number of taps of the synthesis filter.
+        regularization (float): Wiener regularization, relative to the peak filter power.
+        precision (str): Coefficient precision ('float32' or 'float64').
+
+    Returns:
+        np.ndarray: Read-only coefficients, shape (synthesis_taps, vec_len).
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unsupported precision: {precision}")
+
+    return _cached_synthesis_bank(int(vec_len), int(num_taps), parse_window(window), int(synthesis_taps),
+                                  float(regularization), precision)
+
+
+@lru_cache(maxsize=TAP_BANK_CACHE_SIZE)
+def _cached_synthesis_bank(vec_len, num_taps, window, synthesis_taps, regularization, precision):
+    taps = tap_bank(vec_len, num_taps, window, "float64")
+    length = 4 * max(synthesis_taps, num_taps)
+    response = np.fft.rfft(taps, length, axis=0)
+    power = np.abs(response) ** 2
+    inverse = np.fft.irfft(np.conj(response) / (power + regularization * power.max()), length, axis=0)
+
+    delay = synthesis_taps // 2
+    real_dtype = PRECISIONS[precision][0]
+    bank = inverse[(np.arange(synthesis_taps) - delay) % length].astype(real_dtype)
+    bank.setflags(write=False)
+    return bank
+
+
+def inverse_pfb(spectra, num_taps, window, shifted=False, regularization=1e-3):
+    """
+    Rebuild the time series from a whole array of PFB spectra (batch inverse PFB).
+
+    The spectra are transformed back to filtered frames, then every channel is
+    deconvolved along the frame axis with a Wiener filter in the frequency domain.
+
+    Args:
+        spectra (np.ndarray): Unnormalized FFT of the PFB output, shape (N, vec_len).
+        num_taps (int): Number of taps of the analysis filter.
+        window (str or tuple): Window specification (see filter_design.parse_window).
+        shifted (bool): True if the spectra are in fftshift order.
+        regularization (float): Wiener regularization, relative to the peak filter power.
+
+    Returns:
+        np.ndarray: Reconstructed frames, shape (N, vec_len), complex128.
+    """
+    num_frames, vec_len = spectra.shape
+    if shifted:
+        spectra = np.fft.ifftshift(spectra, axes=1)
+    filtered = np.fft.ifft(spectra, axis=1)
+
+    taps = tap_bank(vec_len, num_taps, window, "float64")
+    length = num_frames + num_taps - 1  # Linear (not circular) convolution length
+    response = np.fft.fft(taps, length, axis=0)
+    power = np.abs(response) ** 2
+    deconvolved = np.fft.fft(filtered, length, axis=0) * np.conj(response) / (power + regularization * power.max())
+    return np.fft.ifft(deconvolved, axis=0)[:num_frames]
+
+
+class PolyphaseFilter:
+    """
+    Polyphase weighting engine shared by the PFB and Spectrometer blocks.
+
+    Keeps a contiguous history buffer holding the (num_taps - 1) previous frames
+    followed by the frames of the current call, oldest first, and filters a whole
+    block of frames with one numpy operation per tap. process() is critically
+    sampled; process_oversampled() emits an output frame every `hop` samples.
+
+    Taps and history are stored in the stream precision ('float32', i.e. float32
+    taps and complex64 history) so no product is upcast to complex128. The
+    'float64' precision keeps everything in double and is meant for validation.
+
+    Coefficients are double buffered: a new tap bank is staged as pending (possibly
+    by a background worker) and only becomes active at the start of the next
+    process() call, so a window change never affects a block half way through.
+
+    Args:
+        vec_len (int): Length of one frame.
+        num_taps (int): Number of taps in the filter.
+        window (str or tuple): Window specification (see filter_design.parse_window).
+        precision (str): Storage precision ('float32' or 'float64').
+        bank (callable): Function returning the read-only (num_taps, vec_len) coefficients
+            of a window, tap_bank() of this filter by default (e.g. a synthesis_bank() for the inverse PFB).
+    """
+
+    def __init__(self, vec_len, num_taps, window, precision="float32", bank=None):
+        assert num_taps > 0, "Number of taps must be positive."
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unsupported precision: {precision}")
+
+        self.vec_len = vec_len
+        self.num_taps = num_taps
+        self.precision = precision
+        self.real_dtype, self.complex_dtype = PRECISIONS[precision]
+        self.lock = threading.Lock()
+        self.pending_taps = None
+        self.generation = 0  # Incremented on every coefficient request
+        self.worker = None
+        self.bank = bank or partial(tap_bank, vec_len, num_taps, precision=precision)
+        self.taps = self.bank(window)
+        self.history = np.zeros((self.num_taps - 1, self.vec_len), dtype=self.complex_dtype)
+        self.stored = self.num_taps - 1  # Number of valid frames at the front of the history
+        self.offset = 0  # Start, in samples, of the next oversampled window in the history
+        self.set_hop(vec_len)
+        self.product = np.zeros((0, self.vec_len), dtype=self.complex_dtype)
+        self.accumulator = np.zeros((0, self.vec_len), dtype=self.complex_dtype)
+
+    @property
+    def filter(self):
+        """ Prototype filter coefficients, shape (num_taps * vec_len,). """
+        return self.taps.reshape(-1)
+
+    def set_window(self, window, background=False):
+        """
+        Request the cached coefficients of the given window.
+
+        The new coefficients are staged and swapped in at the next frame boundary.
+
+        Args:
+            window (str or tuple): Window specification (see filter_design.parse_window).
+            background (bool): Build the coefficients in a worker thread instead of the caller's.
+        """
+        parse_window(window)  # Raise for unknown windows in the caller's thread
+
+        generation = self.next_generation()
+        if background:
+            self.worker = threading.Thread(target=self.build_taps, args=(window, generation), daemon=True)
+            self.worker.start()
+        else:
+            self.build_taps(window, generation)
+
+    def set_filter(self, coefficients):
+        """
+        Request custom prototype filter coefficients.
+
+        The new coefficients are staged and swapped in at the next frame boundary.
+
+        Args:
+            coefficients (np.ndarray): Filter coefficients, shape (num_taps * vec_len,).
+        """
+        taps = np.array(coefficients, dtype=self.real_dtype).reshape(self.num_taps, self.vec_len)
+        taps.setflags(write=False)
+        self.stage_taps(taps, self.next_generation())
+
+    def next_generation(self):
+        """ Register a new coefficient request and return its number. """
+        with self.lock:
+            self.generation += 1
+            return self.generation
+
+    def build_taps(self, window, generation):
+        """
+        Fetch (or compute) a tap bank and stage it.
+
+        Args:
+            window (str): Window type.
+            generation (int): Number of the request being served.
+        """
+        self.stage_taps(self.bank(window), generation)
+
+    def stage_taps(self, taps, generation):
+        """
+        Stage a tap bank unless a more recent request was made in the meantime.
+
+        Args:
+            taps (np.ndarray): Read-only coefficients, shape (num_taps, vec_len).
+            generation (int): Number of the request being served.
+        """
+        with self.lock:
+            if generation == self.generation:
+                self.pending_taps = taps
+
+    def swap_taps(self):
+        """
+        Make the staged tap bank active. Called at frame boundaries only.
+
+        Returns:
+            np.ndarray: Active coefficients, shape (num_taps, vec_len).
+        """
+        if self.pending_taps is not None:
+            with self.lock:
+                if self.pending_taps is not None:
+                    self.taps, self.pending_taps = self.pending_taps, None
+        return self.taps
+
+    def wait(self):
+        """ Block until the background worker, if any, has staged its tap bank. """
+        worker = self.worker
+        if worker is not None:
+            worker.join()
+
+    def reserve(self, num_rows):
+        """
+        Make sure the scratch arrays can hold num_rows output frames.
+
+        Args:
+            num_rows (int): Number of output frames computed in one call.
+        """
+        if self.product.shape[0] < num_rows:
+            self.product = np.zeros((num_rows, self.vec_len), dtype=self.complex_dtype)
+            self.accumulator = np.zeros((num_rows, self.vec_len), dtype=self.complex_dtype)
+
+    def update_history(self, frames):
+        """
+        Append a block of frames to the history buffer.
+
+        Args:
+            frames (np.ndarray): New input frames, shape (N, vec_len).
+
+        Returns:
+            np.ndarray: History buffer of shape (stored + N, vec_len).
+        """
+        num_frames = frames.shape[0]
+        needed = self.stored + num_frames
+        if self.history.shape[0] < needed:
+            # Grow the buffer, keeping the stored previous frames at the front
+            grown = np.zeros((needed, self.vec_len), dtype=self.complex_dtype)
+            grown[:self.stored] = self.history[:self.stored]
+            self.history = grown
+
+        buffer = self.history[:needed]
+        buffer[self.stored:] = frames
+        return buffer
+
+    def process(self, frames, out):
+        """
+        Filter a block of frames (critically sampled, one output per input frame).
+
+        Args:
+            frames (np.ndarray): Input frames, shape (N, vec_len).
+            out (np.ndarray): Output array, shape (N, vec_len), written in place.
+        """
+        num_frames = frames.shape[0]
+        buffer = self.update_history(frames)
+        # Coefficients are only swapped here, so the whole block uses one tap bank
+        taps = self.swap_taps()
+
+        self.reserve(num_frames)
+        product = self.product[:num_frames]
+        # Accumulate directly in the output when it already has the storage dtype
+        acc = out if out.dtype == self.complex_dtype else self.accumulator[:num_frames]
+
+        # Apply each phase of the polyphase filter bank to all frames at once.
+        # Frame n sees the frame received `phase` steps earlier, i.e. buffer row
+        # (num_taps - 1 + n - phase).
+        start = self.num_taps - 1
+        np.multiply(buffer[start:start + num_frames], taps[0], out=acc)
+        for phase in range(1, self.num_taps):
+            start = self.num_taps - 1 - phase
+            np.multiply(buffer[start:start + num_frames], taps[phase], out=product)
+            acc += product
+
+        if acc is not out:
+            out[:] = acc
+
+        # Keep the last (num_taps - 1) frames at the front of the buffer for the next call
+        if self.num_taps > 1:
+            buffer[:self.num_taps - 1] = buffer[num_frames:].copy()
+
+    def set_hop(self, hop):
+        """
+        Configure the hop (in samples) between output frames of process_oversampled().
+
+        Args:
+            hop (int): Hop size, 0 < hop <= vec_len.
+        """
+        if not 0 < hop <= self.vec_len:
+            raise ValueError(f"Hop must be in ]0, {self.vec_len}], got {hop}")
+
+        self.hop = int(hop)
+        # Circular shift applied to output frame k is (k * hop) % vec_len, which
+        # repeats with period vec_len / gcd(hop, vec_len): precompute one index row per shift.
+        period = self.vec_len // math.gcd(self.hop, self.vec_len)
+        shifts = (np.arange(period) * self.hop) % self.vec_len
+        self.rotation = (np.arange(self.vec_len)[None, :] - shifts[:, None]) % self.vec_len
+        self.output_count = 0  # Output frame index modulo the rotation period
+
+    def outputs_available(self, num_frames):
+        """
+        Number of oversampled output frames produced if num_frames frames are appended.
+
+        Args:
+            num_frames (int): Number of new input frames.
+
+        Returns:
+            int: Number of output frames.
+        """
+        span = (self.stored + num_frames - self.num_taps) * self.vec_len - self.offset
+        return span // self.hop + 1 if span >= 0 else 0
+
+    def frames_for_outputs(self, num_outputs):
+        """
+        Largest number of input frames whose processing yields at most num_outputs frames.
+
+        Args:
+            num_outputs (int): Output capacity.
+
+        Returns:
+            int: Number of input frames.
+        """
+        limit = num_outputs * self.hop + self.num_taps * self.vec_len + self.offset - 1
+        return max(0, limit // self.vec_len - self.stored)
+
+    def process_oversampled(self, frames, out):
+        """
+        Filter a block of frames with a hop smaller than vec_len (oversampled PFB).
+
+        An output frame is computed every `hop` input samples from the last
+        num_taps * vec_len samples, using the same tap bank and history buffer as
+        process(). Output frame k is circularly shifted by (k * hop) % vec_len so the
+        phase of a stationary tone stays consistent from one output frame to the next.
+
+        Args:
+            frames (np.ndarray): Input frames, shape (N, vec_len).
+            out (np.ndarray): Output array with room for outputs_available(N) frames.
+
+        Returns:
+            int: Number of output frames written.
+        """
+        num_outputs = self.outputs_available(frames.shape[0])
+        buffer = self.update_history(frames)
+        taps = self.swap_taps()
+
+        if num_outputs:
+            # Windows of num_taps frames starting every `hop` samples, as a strided view
+            flat = buffer.reshape(-1)
+            step = flat.strides[0]
+            windows = np.lib.stride_tricks.as_strided(
+                flat[self.offset:],
+                shape=(num_outputs, self.num_taps, self.vec_len),
+                strides=(self.hop * step, self.vec_len * step, step),
+                writeable=False)
+
+            self.reserve(num_outputs)
+            product = self.product[:num_outputs]
+            acc = self.accumulator[:num_outputs]
+
+            # Same phase ordering as process(): the newest frame of a window gets taps[0]
+            np.multiply(windows[:, self.num_taps - 1], taps[0], out=acc)
+            for phase in range(1, self.num_taps):
+                np.multiply(windows[:, self.num_taps - 1 - phase], taps[phase], out=product)
+                acc += product
+
+            rows = (self.output_count + np.arange(num_outputs)) % self.rotation.shape[0]
+            out[:num_outputs] = np.take_along_axis(acc, self.rotation[rows], axis=1)
+            self.output_count = (self.output_count + num_outputs) % self.rotation.shape[0]
+
+        # Drop the whole frames that no future window needs
+        next_start = self.offset + num_outputs * self.hop
+        dropped = next_start // self.vec_len
+        self.stored = buffer.shape[0] - dropped
+        buffer[:self.stored] = buffer[dropped:].copy()
+        self.offset = next_start - dropped * self.vec_len
+        return num_outputs
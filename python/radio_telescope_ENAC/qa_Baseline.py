@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 Mathias Huyghe.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import numpy as np
+from gnuradio import gr, gr_unittest
+from gnuradio.radio_telescope_ENAC import Baseline
+
+
+class qa_Baseline(gr_unittest.TestCase):
+
+    def setUp(self):
+        self.tb = gr.top_block()
+
+    def tearDown(self):
+        self.tb = None
+
+    def test_instance(self):
+        instance = Baseline(256, [(0, 100), (156, 256)])
+        channels, fit, evaluate = instance.model
+        self.assertEqual(len(channels), 200)
+        self.assertEqual(fit.shape, (200, 4))
+        with self.assertRaises(ValueError):
+            Baseline(256, [(200, 300)])
+
+        # The model is replaced as a whole, and kept when the new ranges are rejected
+        instance.set_line_free([(0, 50), (206, 256)])
+        self.assertEqual(len(instance.model[0]), 100)
+        self.assertEqual(instance.model[1].shape, (100, 4))
+        with self.assertRaises(ValueError):
+            instance.set_line_free([(0, 2)])
+        self.assertEqual(len(instance.model[0]), 100)
+
+    def test_polynomial(self):
+        rng = np.random.default_rng(18)
+        channels = np.arange(256)
+        line_free = [(0, 100), (156, 256)]
+        free = np.r_[0:100, 156:256]
+        line = 5.0 * np.exp(-0.5 * ((channels - 128) / 6.0) ** 2)
+        spectra = np.empty((6, 256), dtype=np.float32)
+        for k in range(6):
+            baseline = np.polyval(rng.standard_normal(4), (channels - 128) / 128.0) + 20
+            spectra[k] = baseline + line + 0.01 * rng.standard_normal(256)
+
+        block = Baseline(256, line_free, "polynomial", 3)
+        out = np.zeros_like(spectra)
+        self.assertEqual(block.work([spectra], [out]), 6)
+
+        # Same residuals as a per-spectrum polynomial fit of the line-free channels
+        for k in range(6):
+            coefficients = np.polyfit(channels[free], spectra[k, free].astype(np.float64), 3)
+            np.testing.assert_allclose(out[k], spectra[k] - np.polyval(coefficients, channels), atol=2e-4)
+        # The line survives the subtraction
+        np.testing.assert_allclose(out, np.tile(line, (6, 1)), atol=0.05)
+
+    def test_spline(self):
+        channels = np.arange(512)
+        ripple = 2.0 + np.sin(channels / 40.0) + 0.3 * np.cos(channels / 15.0)
+        line = 3.0 * np.exp(-0.5 * ((channels - 250) / 4.0) ** 2)
+        spectra = (ripple + line)[None, :].astype(np.float32)
+
+        block = Baseline(512, [(0, 230), (270, 512)], "spline", 3, 16)
+        out = np.zeros_like(spectra)
+        block.work([spectra], [out])
+        np.testing.assert_allclose(out[0], line, atol=0.05)
+
+        # A smoothing penalty gives a smoother, less exact fit
+        smooth = Baseline(512, [(0, 230), (270, 512)], "spline", 3, 16, 1e3)
+        smooth.work([spectra], [out])
+        free = np.r_[0:230, 270:512]
+        self.assertGreater(np.std(out[0, free]), 1e-3)
+
+    def test_wide_gap(self):
+        line_free = [(0, 1800), (2300, 4096)]
+        # 64 knots leave B-splines entirely inside the gap, not fitted by any channel
+        with self.assertRaises(ValueError):
+            Baseline(4096, line_free, "spline", 3, 64)
+
+        # The smoothing penalty bridges the gap
+        spectra = np.full((1, 4096), 10.0, dtype=np.float32)
+        block = Baseline(4096, line_free, "spline", 3, 64, 1.0)
+        out = np.ones_like(spectra)
+        block.work([spectra], [out])
+        np.testing.assert_allclose(out, 0, atol=1e-3)
+
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_Baseline)
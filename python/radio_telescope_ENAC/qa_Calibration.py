@@ -6,9 +6,56 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 #
 
+import os
+import tempfile
+from collections import namedtuple
+
+import numpy as np
+import pmt
 from gnuradio import gr, gr_unittest
 # from gnuradio import blocks
 from gnuradio.radio_telescope_ENAC import Calibration
+from gnuradio.radio_telescope_ENAC.calibration_store import CalibrationStore
+
+
+class RecordingCalibration(Calibration):
+    """ Calibration with the published messages recorded instead of sent. """
+
+    def __init__(self, *args):
+        self.messages = []
+        Calibration.__init__(self, *args)
+
+    def message_port_pub(self, port, message):
+        self.messages.append(message)
+
+
+Tag = namedtuple("Tag", "offset key value")
+
+
+class SwitchedCalibration(Calibration):
+    """ Calibration with the scheduler-side item counter and 'switch' tags replaced by plain attributes. """
+
+    def __init__(self, *args):
+        Calibration.__init__(self, *args)
+        self.items_read = 0
+        self.tags = []
+
+    def nitems_read(self, which_input):
+        return self.items_read
+
+    def get_tags_in_window(self, which_input, rel_start, rel_end, key):
+        return [tag for tag in self.tags if self.items_read + rel_start <= tag.offset < self.items_read + rel_end]
+
+    def run(self, spectra, states):
+        """ Processes the spectra with a 'switch' tag on every change of state. """
+        changes = np.flatnonzero(np.diff(np.concatenate(([not states[0]], states))))
+        self.tags = [Tag(self.items_read + k, pmt.intern("switch"), pmt.from_bool(bool(states[k])))
+                     for k in changes]
+        outs = [np.zeros(spectra.shape, dtype=np.float32) for _ in range(3)]
+        self.work([spectra.astype(np.float32)], outs)
+        self.items_read += len(spectra)
+        return outs[0]
+
 
 class qa_Calibration(gr_unittest.TestCase):
 
@@ -19,14 +66,178 @@ class qa_Calibration(gr_unittest.TestCase):
         self.tb = None
 
     def test_instance(self):
-        # FIXME: Test will fail until you pass sensible arguments to the constructor
-        instance = Calibration()
+        instance = Calibration('Non_calibrated', 4096, 2e6)
+        # The default reference band is the historical 2541:2786 slice at 4096 channels
+        self.assertEqual(instance.reference, slice(2541, 2786))
+        self.assertEqual(Calibration('Non_calibrated', 1024, 2e6).reference, slice(635, 696))
+
+    def test_spike_smoothing(self):
+        rng = np.random.default_rng(13)
+        spectrum = (1.0 + 0.05 * rng.random(64)).astype(np.float32)
+        spikes = [1, 4, 5, 40, 62]
+        spectrum[spikes] = 10.0
+
+        block = Calibration('Non_calibrated', 64, 1e6, 0, 1.2, (10, 30), 5)
+        outs = [np.zeros((1, 64), dtype=np.float32) for _ in range(3)]
+        block.work([spectrum[None, :]], outs)
+
+        # Reference: median of the 5 channels around each spike, edges extended
+        padded = np.pad(spectrum, 2, mode="edge")
+        expected = spectrum.copy()
+        for index in np.flatnonzero(spectrum > 1.2 * spectrum[10:30].mean()):
+            expected[index] = np.median(padded[index:index + 5])
+        self.assertEqual(list(np.flatnonzero(expected != spectrum)), spikes)
+        np.testing.assert_allclose(outs[0][0], expected)
 
     def test_001_descriptive_test_name(self):
         # set up fg
         self.tb.run()
         # check data
 
+    def test_batch_matches_single_vectors(self):
+        rng = np.random.default_rng(14)
+        spectra = {"Cold": 1.0 + rng.random((5, 64)), "Hot": 3.0 + rng.random((5, 64)),
+                   "Calibrated": 2.0 + rng.random((5, 64))}
+        sk = 1.0 + 0.01 * rng.standard_normal((5, 64))
+        sk[[2, 4], 7] = 3.0  # Channel flagged as RFI in two vectors
+
+        batch = Calibration('Cold', 64, 1e6, 0.1, 1.2, (10, 30))
+        single = Calibration('Cold', 64, 1e6, 0.1, 1.2, (10, 30))
+        for mode in ("Cold", "Hot", "Calibrated"):
+            batch.set_calibration_type(mode)
+            single.set_calibration_type(mode)
+            inputs = [spectra[mode].astype(np.float32), sk.astype(np.float32)]
+            batch_outs = [np.zeros((5, 64), dtype=np.float32) for _ in range(3)]
+            self.assertEqual(batch.work(inputs, batch_outs), 5)
+            for k in range(5):
+                outs = [np.zeros((1, 64), dtype=np.float32) for _ in range(3)]
+                single.work([inputs[0][k:k + 1], inputs[1][k:k + 1]], outs)
+                for batch_out, out in zip(batch_outs, outs):
+                    np.testing.assert_allclose(batch_out[k], out[0], rtol=1e-6)
+
+        # The flagged channel kept the reference of the last unflagged vector
+        self.assertEqual(batch.hot_spectrum[7], np.float32(spectra["Hot"][3, 7]))
+
+    def test_calibration_window(self):
+        rng = np.random.default_rng(16)
+        cold = (1.0 + rng.random((7, 64))).astype(np.float32)
+        hot = (3.0 + rng.random((3, 64))).astype(np.float32)
+
+        block = Calibration('Hot', 64, 1e6, 0, 0, None, 21, "", 3)
+        outs = [np.zeros((7, 64), dtype=np.float32) for _ in range(3)]
+        block.work([hot], [out[:3] for out in outs])
+        np.testing.assert_allclose(block.hot_spectrum, hot.mean(axis=0), rtol=1e-6)
+
+        block.set_calibration_type('Cold')
+        Tsys_before = block.Tsys.copy()
+        # Windows close on vectors 2 and 5, the last vector stays in the running sums
+        block.work([cold[:4]], [out[:4] for out in outs])
+        block.work([cold[4:]], [out[4:] for out in outs])
+        self.assertEqual(block.window_count, 1)
+        np.testing.assert_allclose(block.cold_spectrum, cold[3:6].mean(axis=0), rtol=1e-6)
+
+        _, Tsys_first, _ = block.solve(block.hot_spectrum, cold[:3].mean(axis=0))
+        expected = [Tsys_before] * 2 + [Tsys_first] * 3 + [block.Tsys] * 2
+        np.testing.assert_allclose(outs[1], np.array(expected, dtype=np.float32), rtol=1e-5)
+        np.testing.assert_allclose(block.noise_offset, block.Gsys * 1.380649e-23 * 1e6 / 64 * block.Tsys,
+                                   rtol=1e-6)
+
+    def test_calibrated_transform(self):
+        rng = np.random.default_rng(17)
+        block = RecordingCalibration('Cold', 64, 1e6, 0, 0, None, 21, "", 2)
+        outs = [np.zeros((4, 64), dtype=np.float32) for _ in range(3)]
+        block.work([(1.0 + rng.random((4, 64))).astype(np.float32)], outs)
+        block.set_calibration_type('Hot')
+        block.work([(3.0 + rng.random((4, 64))).astype(np.float32)], outs)
+        # One message each time the solution changes, with the latest solution
+        self.assertEqual(len(block.messages), 2)
+
+        block.set_calibration_type('Calibrated')
+        spectra = (2.0 + rng.random((4, 64))).astype(np.float32)
+        block.work([spectra], outs)
+        self.assertEqual(len(block.messages), 2)
+        delta_f = 1e6 / 64
+        expected = spectra / block.Gsys - block.Gsys * 1.380649e-23 * delta_f * block.Tsys
+        np.testing.assert_allclose(outs[0], expected, rtol=1e-5)
+        np.testing.assert_allclose(outs[1], np.tile(block.Tsys, (4, 1)), rtol=1e-6)
+        np.testing.assert_allclose(outs[2], np.tile(10 * np.log10(block.Gsys), (4, 1)), rtol=1e-5)
+
+    def test_position_switching(self):
+        rng = np.random.default_rng(19)
+        spectra = 1.0 + rng.random((12, 64))
+        states = np.array([1, 1, 0, 0, 0, 1, 1, 1, 0, 0, 1, 0], dtype=bool)
+
+        block = SwitchedCalibration('Position_switching', 64, 1e6, 0, 0)
+        out = np.concatenate([block.run(spectra[:5], states[:5]), block.run(spectra[5:], states[5:])])
+
+        # Running averages of each state up to every vector, 0 until both states were seen
+        for k in range(12):
+            signal = spectra[:k + 1][states[:k + 1]].mean(axis=0)
+            reference = spectra[:k + 1][~states[:k + 1]]
+            expected = (signal - reference.mean(axis=0)) / reference.mean(axis=0) if len(reference) else 0
+            np.testing.assert_allclose(out[k], expected, rtol=1e-5, atol=1e-6)
+
+    def test_frequency_switching(self):
+        channels = np.arange(256)
+        shift = 40
+
+        def line(center):
+            return 0.01 * np.exp(-0.5 * ((channels - center) / 3.0) ** 2)
+
+        # The reference LO puts the line shift channels higher
+        signal = 5.0 * (1 + line(100))
+        reference = 5.0 * (1 + line(100 + shift))
+        spectra = np.array([signal, reference] * 3)
+        states = np.array([True, False] * 3)
+
+        block = SwitchedCalibration('Frequency_switching', 256, 1e6, 0, 0, None, 21, "", 1, shift)
+        out = block.run(spectra, states)
+        # Full amplitude at the line, the two half-amplitude negative ghosts are
+        # shift channels away on each side
+        np.testing.assert_allclose(out[-1, 80:121], line(100)[80:121], atol=2e-4)
+        np.testing.assert_allclose(out[-1, [60, 140]], -0.005, atol=2e-4)
+        # The last shift channels have no image in the band
+        self.assertTrue(np.all(np.isnan(out[:, -shift:])))
+        self.assertTrue(np.all(np.isfinite(out[:, :-shift])))
+
+        # Swapping signal and reference gives a negative offset, the first channels are left out
+        block = SwitchedCalibration('Frequency_switching', 256, 1e6, 0, 0, None, 21, "", 1, -shift)
+        out = block.run(spectra[::-1].copy(), states)
+        np.testing.assert_allclose(out[-1, 120:161], line(100 + shift)[120:161], atol=2e-4)
+        self.assertTrue(np.all(np.isnan(out[:, :shift])))
+        self.assertTrue(np.all(np.isfinite(out[:, shift:])))
+
+        # The state can also come from a 'switch' message
+        block.handle_switch(pmt.from_bool(False))
+        self.assertFalse(block.switch_signal)
+
+    def test_warm_start(self):
+        rng = np.random.default_rng(15)
+        with tempfile.TemporaryDirectory() as directory:
+            block = Calibration('Cold', 64, 1e6, 0, 0, None, 21, directory)
+            outs = [np.zeros((2, 64), dtype=np.float32) for _ in range(3)]
+            block.work([(1.0 + rng.random((2, 64))).astype(np.float32)], outs)
+            block.set_calibration_type('Hot')
+            block.work([(3.0 + rng.random((2, 64))).astype(np.float32)], outs)
+            block.set_calibration_type('Calibrated')
+            self.assertEqual(len(CalibrationStore(directory, 64, 1e6).paths()), 1)
+
+            # A corrupted newer file and a solution for another setup are ignored
+            with open(os.path.join(directory, CalibrationStore(directory, 64, 1e6).prefix + "99990101T000000_000000.npy"),
+                      "wb") as file:
+                file.write(b"garbage")
+            CalibrationStore(directory, 128, 1e6).save(*np.ones((4, 128)))
+
+            restarted = Calibration('Calibrated', 64, 1e6, 0, 0, None, 21, directory)
+            self.assertIsInstance(restarted.Tsys, np.memmap)
+            for name in ("hot_spectrum", "cold_spectrum", "Tsys", "Gsys"):
+                np.testing.assert_array_equal(getattr(restarted, name), getattr(block, name))
+
+            # The memory-mapped solution can be updated without touching the file
+            restarted.set_calibration_type('Hot')
+            restarted.work([np.full((1, 64), 5.0, dtype=np.float32)], outs)
+            np.testing.assert_array_equal(CalibrationStore(directory, 64, 1e6).latest()["Tsys"], block.Tsys)
+
 
 if __name__ == '__main__':
     gr_unittest.run(qa_Calibration)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 Mathias Huyghe.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from gnuradio import gr, gr_unittest
+from gnuradio.radio_telescope_ENAC import FFT
+from gnuradio.radio_telescope_ENAC import fft_backends
+
+
+class qa_FFT(gr_unittest.TestCase):
+
+    def setUp(self):
+        self.tb = gr.top_block()
+
+    def tearDown(self):
+        self.tb = None
+
+    def test_instance(self):
+        instance = FFT(64, True, "numpy", 1)
+        self.assertEqual(instance.fft.backend, "numpy")
+
+    def test_backends_match_numpy(self):
+        rng = np.random.default_rng(2)
+        frames = (rng.standard_normal((5, 64))
+                  + 1j * rng.standard_normal((5, 64))).astype(np.complex64)
+        expected = np.fft.fftshift(np.fft.fft(frames, axis=1), axes=1)
+
+        for backend in ("numpy", "scipy"):
+            block = FFT(64, True, backend, 2)
+            out = np.empty_like(frames)
+            block.work([frames], [out])
+            np.testing.assert_allclose(out, expected, rtol=1e-4, atol=1e-4)
+
+    @unittest.skipUnless(fft_backends.pyfftw, "pyFFTW is not installed")
+    def test_pyfftw_backend(self):
+        rng = np.random.default_rng(4)
+        frames = (rng.standard_normal((40, 64))
+                  + 1j * rng.standard_normal((40, 64))).astype(np.complex64)
+        expected = np.fft.fftshift(np.fft.fft(frames, axis=1), axes=1)
+
+        with tempfile.TemporaryDirectory() as directory:
+            wisdom_file = os.path.join(directory, "wisdom.pkl")
+            block = FFT(64, True, "pyfftw", 1, wisdom_file)
+            # Block sizes that are not multiples of the plan batch, before and after the measured plan
+            for count in (5, 40):
+                out = np.empty((count, 64), dtype=np.complex64)
+                block.work([frames[:count]], [out])
+                np.testing.assert_allclose(out, expected[:count], rtol=1e-4, atol=1e-4)
+                block.fft.wait()
+            # A single plan serves every block size, wisdom is only written on stop
+            self.assertEqual(len(block.fft.plans), 1)
+            self.assertFalse(os.path.exists(wisdom_file))
+            self.assertTrue(block.stop())
+            self.assertTrue(os.path.exists(wisdom_file))
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            FFT(64, True, "fftpack", 1)
+
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_FFT)
@@ -6,9 +6,41 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 #
 
+import numpy as np
+import pmt
 from gnuradio import gr, gr_unittest
 # from gnuradio import blocks
-from gnuradio.radio_telescope_ENAC import Integration
+from gnuradio.radio_telescope_ENAC import Integration, kurtosis
+
+
+class TaggedIntegration(Integration):
+    """ Integration with the scheduler-side item counters and tags replaced by plain attributes. """
+
+    def __init__(self, *args):
+        Integration.__init__(self, *args)
+        self.items_read = 0
+        self.items_written = 0
+        self.tags = []
+
+    def nitems_read(self, which_input):
+        return self.items_read
+
+    def nitems_written(self, which_output):
+        return self.items_written
+
+    def get_tags_in_window(self, which_input, rel_start, rel_end, key):
+        return []
+
+    def add_item_tag(self, which_output, offset, key, value):
+        self.tags.append((offset, pmt.symbol_to_string(key), value))
+
+    def run(self, frames, nb_out):
+        out = np.zeros((nb_out, self.vec_len), dtype=np.float32)
+        produced = self.general_work([frames], [out])
+        self.items_read += len(frames)
+        self.items_written += produced
+        return out[:produced]
+
 
 class qa_Integration(gr_unittest.TestCase):
 
@@ -19,8 +51,227 @@ class qa_Integration(gr_unittest.TestCase):
         self.tb = None
 
     def test_instance(self):
-        # FIXME: Test will fail until you pass sensible arguments to the constructor
-        instance = Integration()
+        instance = Integration(16, 4)
+        self.assertEqual(instance.nb_integration, 4)
+
+    def test_emits_every_average(self):
+        rng = np.random.default_rng(6)
+        frames = rng.random((14, 16)).astype(np.float32)
+        expected = frames[:12].reshape(3, 4, 16).mean(axis=1)
+
+        block = Integration(16, 4)
+        out = np.zeros((8, 16), dtype=np.float32)
+        # 5 vectors: one average, one vector left in the accumulator
+        produced = block.general_work([frames[:5]], [out])
+        self.assertEqual(produced, 1)
+        self.assertEqual(block.iteration, 1)
+        # 9 more vectors complete two averages and leave two vectors
+        produced += block.general_work([frames[5:]], [out[produced:]])
+        self.assertEqual(produced, 3)
+        self.assertEqual(block.iteration, 2)
+        np.testing.assert_allclose(out[:3], expected, rtol=1e-5)
+
+    def test_output_buffer_limit(self):
+        frames = np.ones((12, 16), dtype=np.float32)
+        block = Integration(16, 4)
+        out = np.zeros((2, 16), dtype=np.float32)
+        self.assertEqual(block.general_work([frames], [out]), 2)
+        self.assertEqual(block.iteration, 0)
+
+    def test_smoothing_modes(self):
+        rng = np.random.default_rng(7)
+        frames = rng.random((20, 16)).astype(np.float32)
+        nb = 4
+
+        # References computed one vector at a time
+        ema = [frames[0].astype(np.float64)]
+        for frame in frames[1:]:
+            ema.append(ema[-1] + (frame - ema[-1]) / nb)
+        boxcar = [frames[max(0, k - nb + 1):k + 1].mean(axis=0) for k in range(len(frames))]
+
+        for mode, expected in (("ema", ema), ("boxcar", boxcar)):
+            block = Integration(16, nb, 0, 0, 1, mode)
+            out = np.zeros((20, 16), dtype=np.float32)
+            # Uneven work calls, one shorter than the window and one longer
+            produced = block.general_work([frames[:3]], [out])
+            produced += block.general_work([frames[3:]], [out[produced:]])
+            self.assertEqual(produced, 20)
+            np.testing.assert_allclose(out, np.array(expected), rtol=1e-5)
+
+    def test_change_integration_number(self):
+        rng = np.random.default_rng(16)
+        frames = rng.random((14, 16)).astype(np.float32)
+
+        block = Integration(16, 4)
+        out = np.zeros((8, 16), dtype=np.float32)
+        produced = block.general_work([frames[:6]], [out])
+        # Staged by the callback, applied at the next work call only
+        block.set_integration_number(2)
+        self.assertEqual(block.nb_integration, 4)
+        # The two vectors left in the accumulator already make a shorter integration
+        produced += block.general_work([frames[6:]], [out[produced:]])
+        self.assertEqual(block.nb_integration, 2)
+        self.assertEqual(produced, 6)
+        np.testing.assert_allclose(out[1:6], frames[4:14].reshape(5, 2, 16).mean(axis=1), rtol=1e-5)
+
+        block = Integration(16, 4, 0, 0, 1, "boxcar")
+        out = np.zeros((14, 16), dtype=np.float32)
+        block.general_work([frames[:6]], [out])
+        ring = block.ring
+        block.set_integration_number(3)
+        self.assertIs(block.ring, ring)
+        # The smoothing restarts with the new window
+        block.general_work([frames[6:]], [out[6:]])
+        self.assertEqual(block.ring.shape, (3, 16))
+        np.testing.assert_allclose(out[8:], [frames[k - 2:k + 1].mean(axis=0) for k in range(8, 14)], rtol=1e-5)
+
+    def test_robust_modes(self):
+        rng = np.random.default_rng(8)
+        frames = (1.0 + 0.01 * rng.standard_normal((34, 16))).astype(np.float32)
+        # Strong bursts in a few channels of single vectors
+        frames[5, 3] += 1e3
+        frames[20, 7:9] += 1e4
+        nb = 16
+
+        # Reference: sub-block means of each window, computed window by window
+        sub_means = frames[:32].reshape(2, 8, 2, 16).mean(axis=2)
+        expected = {"median_of_means": np.median(sub_means, axis=1)}
+        clipped = []
+        for window, means in zip(frames[:32].reshape(2, nb, 16), sub_means):
+            keep = np.ones(means.shape, dtype=bool)
+            for _ in range(5):
+                center = np.array([np.median(means[keep[:, c], c]) for c in range(16)])
+                spread = 1.4826 * np.array([np.median(np.abs(means[keep[:, c], c] - center[c]))
+                                            for c in range(16)])
+                keep &= np.abs(means - center) <= 3.0 * spread
+            clipped.append([window.reshape(8, 2, 16)[keep[:, c], :, c].mean() for c in range(16)])
+        expected["sigma_clip"] = np.array(clipped)
+
+        for mode in ("sigma_clip", "median_of_means"):
+            block = Integration(16, nb, 0, 0, 1, mode, 8, 3.0)
+            out = np.zeros((4, 16), dtype=np.float32)
+            produced = block.general_work([frames[:11]], [out])
+            produced += block.general_work([frames[11:]], [out[produced:]])
+            self.assertEqual(produced, 2)
+            self.assertEqual(block.iteration, 2)
+            np.testing.assert_allclose(out[:2], expected[mode], rtol=1e-5)
+            # The bursts are rejected
+            np.testing.assert_allclose(out[:2], 1.0, atol=0.05)
+
+    def test_robust_change_integration_number(self):
+        rng = np.random.default_rng(17)
+        frames = rng.random((18, 16)).astype(np.float32)
+
+        block = Integration(16, 16, 0, 0, 1, "median_of_means", 8)
+        out = np.zeros((4, 16), dtype=np.float32)
+        self.assertEqual(block.general_work([frames[:10]], [out]), 0)
+        block_sums = block.block_sums
+        # Staged by the callback: the sub-block buffers of the running integration are untouched
+        block.set_integration_number(4)
+        self.assertIs(block.block_sums, block_sums)
+        self.assertEqual(block.iteration, 10)
+
+        # Applied at the next work call, which restarts the integration with 4 sub-blocks of one vector
+        self.assertEqual(block.general_work([frames[10:]], [out]), 2)
+        self.assertEqual(block.block_sums.shape, (4, 16))
+        np.testing.assert_allclose(out[:2], np.median(frames[10:].reshape(2, 4, 16), axis=1), rtol=1e-5)
+
+    def test_spectral_kurtosis(self):
+        rng = np.random.default_rng(9)
+        nb, nb_accumulation = 64, 4
+        # Power spectra of complex Gaussian noise, each the sum of nb_accumulation spectra
+        samples = rng.standard_normal((2 * nb + 5, nb_accumulation, 32, 2))
+        frames = np.sum(np.square(samples), axis=(1, 3)).astype(np.float32)
+        # Intermittent burst on channel 5
+        frames[::7, 5] *= 50
+
+        block = Integration(32, nb, 0, 0, nb_accumulation, "mean", 8, 3.0, True)
+        out = np.zeros((3, 32), dtype=np.float32)
+        sk = np.zeros((3, 32), dtype=np.float32)
+        produced = block.general_work([frames[:40]], [out, sk])
+        produced += block.general_work([frames[40:]], [out[produced:], sk[produced:]])
+        self.assertEqual(produced, 2)
+
+        windows = frames[:2 * nb].astype(np.float64).reshape(2, nb, 32)
+        s1, s2 = windows.sum(axis=1), np.square(windows).sum(axis=1)
+        expected = (nb * nb_accumulation + 1) / (nb - 1) * (nb * s2 / s1 ** 2 - 1)
+        np.testing.assert_allclose(sk[:2], expected, rtol=1e-4)
+        np.testing.assert_allclose(out[:2], windows.mean(axis=1), rtol=1e-5)
+
+        # Only the burst channel is flagged
+        flagged = kurtosis.mask(sk[:2], kurtosis.threshold(nb, nb_accumulation, sigma=5))
+        self.assertTrue(flagged[:, 5].all())
+        self.assertFalse(np.delete(flagged, 5, axis=1).any())
+
+    def test_stable_accumulators(self):
+        rng = np.random.default_rng(10)
+        nb = 4000
+        # Large common level with small fluctuations: plain float32 sums lose the low-order bits
+        frames = (1e4 + rng.random((nb + 10, 8))).astype(np.float32)
+        expected = frames[:nb].astype(np.float64).mean(axis=0)
+
+        errors = {}
+        for accumulator in ("float32", "float64", "kahan"):
+            block = Integration(8, nb, 0, 0, 1, "mean", 8, 3.0, False, accumulator)
+            out = np.zeros((2, 8), dtype=np.float32)
+            # The running integration spans many work calls
+            produced = 0
+            for start in range(0, len(frames), 300):
+                produced += block.general_work([frames[start:start + 300]], [out[produced:]])
+            self.assertEqual(produced, 1)
+            errors[accumulator] = np.max(np.abs(out[0] - expected))
+
+        # Both stable accumulators are within float32 rounding of the result
+        self.assertLess(errors["float64"], 1e-3)
+        self.assertLess(errors["kahan"], 1e-3)
+        self.assertLess(errors["kahan"], errors["float32"])
+
+        # Several integrations completed in one call go through the grouped sums
+        frames = (1e4 + rng.random((3 * nb, 8))).astype(np.float32)
+        expected = frames.astype(np.float64).reshape(3, nb, 8).mean(axis=1)
+        block = Integration(8, nb, 0, 0, 1, "mean", 8, 3.0, False, "kahan")
+        out = np.zeros((3, 8), dtype=np.float32)
+        self.assertEqual(block.general_work([frames], [out]), 3)
+        self.assertLess(np.max(np.abs(out - expected)), 1e-3)
+
+    def test_hold_outputs(self):
+        rng = np.random.default_rng(12)
+        frames = rng.random((27, 16)).astype(np.float32)
+        nb = 6
+
+        block = Integration(16, nb, 0, 0, 1, "mean", 8, 3.0, True, "float32", True)
+        self.assertEqual(block.hold_port, 2)
+        outs = [np.zeros((5, 16), dtype=np.float32) for _ in range(5)]
+        produced = 0
+        for first, last in ((0, 4), (4, 15), (15, 27)):
+            produced += block.general_work([frames[first:last]], [out[produced:] for out in outs])
+        self.assertEqual(produced, 4)
+
+        windows = frames[:24].reshape(4, nb, 16)
+        np.testing.assert_allclose(outs[0][:4], windows.mean(axis=1), rtol=1e-5)
+        np.testing.assert_array_equal(outs[2][:4], windows.max(axis=1))
+        np.testing.assert_array_equal(outs[3][:4], windows.min(axis=1))
+        np.testing.assert_array_equal(outs[4][:4], windows.argmax(axis=1))
+
+    def test_time_tags(self):
+        # 16-channel vectors at 1.6 kS/s, pre-accumulated by 10: 0.1 s per input vector
+        block = TaggedIntegration(16, 1, 1600.0, 0.4, 10)
+        self.assertEqual(block.nb_integration, 4)
+
+        frames = np.ones((10, 16), dtype=np.float32)
+        self.assertEqual(len(block.run(frames[:6], 8)), 1)
+        self.assertEqual(len(block.run(frames[6:], 8)), 1)
+
+        t0 = block.time_ref[1]
+        starts = [(offset, pmt.to_uint64(pmt.tuple_ref(value, 0)) + pmt.to_double(pmt.tuple_ref(value, 1)))
+                  for offset, key, value in block.tags if key == "rx_time"]
+        ends = [pmt.to_uint64(pmt.tuple_ref(value, 0)) + pmt.to_double(pmt.tuple_ref(value, 1))
+                for offset, key, value in block.tags if key == "rx_time_end"]
+        counts = [pmt.to_long(value) for offset, key, value in block.tags if key == "nb_frames"]
+        self.assertEqual([offset for offset, _ in starts], [0, 1])
+        np.testing.assert_allclose([start for _, start in starts], [t0, t0 + 0.4])
+        np.testing.assert_allclose(ends, [t0 + 0.4, t0 + 0.8])
+        self.assertEqual(counts, [4, 4])
 
     def test_001_descriptive_test_name(self):
         # set up fg
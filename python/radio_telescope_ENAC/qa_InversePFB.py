@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 Mathias Huyghe.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import numpy as np
+from gnuradio import gr, gr_unittest
+from gnuradio.radio_telescope_ENAC import PFB, InversePFB
+from gnuradio.radio_telescope_ENAC.polyphase import inverse_pfb, synthesis_bank
+
+
+def relative_error(estimate, reference):
+    return np.sqrt(np.mean(np.abs(estimate - reference) ** 2) / np.mean(np.abs(reference) ** 2))
+
+
+class qa_InversePFB(gr_unittest.TestCase):
+
+    def setUp(self):
+        self.tb = gr.top_block()
+        vec_len, num_taps = 64, 4
+        rng = np.random.default_rng(5)
+        self.frames = (rng.standard_normal((300, vec_len))
+                       + 1j * rng.standard_normal((300, vec_len))).astype(np.complex64)
+        pfb = PFB(vec_len, "hamming", num_taps)
+        filtered = np.empty_like(self.frames)
+        pfb.work([self.frames], [filtered])
+        self.spectra = np.fft.fftshift(np.fft.fft(filtered, axis=1), axes=1).astype(np.complex64)
+
+    def tearDown(self):
+        self.tb = None
+
+    def test_instance(self):
+        instance = InversePFB(64, "hamming", 4, 64, True)
+        np.testing.assert_array_equal(instance.engine.taps, synthesis_bank(64, 4, "hamming", 64))
+
+    def test_set_window_type(self):
+        instance = InversePFB(64, "hamming", 4, 32, True)
+        instance.set_window_type("hanning")
+        instance.engine.wait()
+        np.testing.assert_array_equal(instance.engine.swap_taps(), synthesis_bank(64, 4, "hanning", 32))
+
+    def test_batch_reconstruction(self):
+        frames = inverse_pfb(self.spectra, 4, "hamming", shifted=True)
+        self.assertLess(relative_error(frames[8:-8], self.frames[8:-8]), 0.05)
+
+    def test_streaming_reconstruction(self):
+        synthesis_taps = 64
+        block = InversePFB(64, "hamming", 4, synthesis_taps, True)
+        out = np.empty_like(self.spectra)
+        block.work([self.spectra[:100]], [out[:100]])
+        block.work([self.spectra[100:]], [out[100:]])
+
+        # The output is delayed by synthesis_taps // 2 frames
+        delay = synthesis_taps // 2
+        rebuilt = out[delay:]
+        self.assertLess(relative_error(rebuilt[synthesis_taps:], self.frames[:-delay][synthesis_taps:]), 0.05)
+
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_InversePFB)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 Mathias Huyghe.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import numpy as np
+from gnuradio import gr, gr_unittest
+from gnuradio.radio_telescope_ENAC import MultiIntegration
+
+
+class RecordingMultiIntegration(MultiIntegration):
+    """ MultiIntegration with the scheduler-side consume and produce calls recorded. """
+
+    def consume(self, which_input, how_many_items):
+        self.consumed = how_many_items
+
+    def produce(self, which_output, how_many_items):
+        self.produced[which_output] = how_many_items
+
+    def run(self, frames, outs):
+        self.produced = {}
+        return self.general_work([frames], outs)
+
+
+class qa_MultiIntegration(gr_unittest.TestCase):
+
+    def setUp(self):
+        self.tb = gr.top_block()
+
+    def tearDown(self):
+        self.tb = None
+
+    def test_instance(self):
+        instance = MultiIntegration(16, [2, 6, 12])
+        self.assertEqual(instance.group_sizes, [2, 3, 2])
+        # Cadences in seconds: 0.1 s per input vector
+        instance = MultiIntegration(16, [1, 10, 60], 1600.0, 10)
+        self.assertEqual(instance.cadences, [10, 100, 600])
+        # The frame duration does not divide the cadences: each one is rounded to a
+        # multiple of the previous count (0.0262 s per input vector)
+        instance = MultiIntegration(4096, [1, 10, 60], 2.5e6, 16)
+        self.assertEqual(instance.cadences, [38, 380, 2280])
+        self.assertEqual(instance.group_sizes, [38, 10, 6])
+        np.testing.assert_allclose(instance.durations, np.array([38, 380, 2280]) * 4096 * 16 / 2.5e6)
+        with self.assertRaises(ValueError):
+            MultiIntegration(16, [4, 6])
+
+    def test_cadences(self):
+        rng = np.random.default_rng(11)
+        frames = rng.random((40, 16)).astype(np.float32)
+        cadences = [2, 6, 12]
+
+        block = RecordingMultiIntegration(16, cadences)
+        outs = [np.zeros((20, 16), dtype=np.float32) for _ in cadences]
+        produced = [0, 0, 0]
+        # Work calls that split every cadence
+        for first, last in ((0, 5), (5, 17), (17, 40)):
+            ret = block.run(frames[first:last], [out[n:] for out, n in zip(outs, produced)])
+            self.assertEqual(ret, gr.WORK_CALLED_PRODUCE)
+            produced = [n + block.produced[port] for port, n in enumerate(produced)]
+
+        self.assertEqual(produced, [20, 6, 3])
+        for out, n, cadence in zip(outs, produced, cadences):
+            expected = frames[:n * cadence].reshape(n, cadence, 16).mean(axis=1)
+            np.testing.assert_allclose(out[:n], expected, rtol=1e-5)
+
+    def test_output_buffer_limit(self):
+        frames = np.ones((30, 16), dtype=np.float32)
+        block = RecordingMultiIntegration(16, [2, 4])
+        outs = [np.zeros((8, 16), dtype=np.float32), np.zeros((1, 16), dtype=np.float32)]
+        block.run(frames, outs)
+        # The single slot of the longest cadence limits the call to 4 input vectors
+        self.assertEqual(block.consumed, 4)
+        self.assertEqual(block.produced, {0: 2, 1: 1})
+
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_MultiIntegration)
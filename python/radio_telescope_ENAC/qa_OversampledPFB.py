@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 Mathias Huyghe.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import numpy as np
+from gnuradio import gr, gr_unittest
+from gnuradio.radio_telescope_ENAC import PFB, OversampledPFB
+
+
+class RecordingOversampledPFB(OversampledPFB):
+    """ OversampledPFB with the scheduler-side consume call recorded. """
+
+    def consume(self, which_input, how_many_items):
+        self.consumed = how_many_items
+
+
+class qa_OversampledPFB(gr_unittest.TestCase):
+
+    def setUp(self):
+        self.tb = gr.top_block()
+
+    def tearDown(self):
+        self.tb = None
+
+    def test_instance(self):
+        instance = OversampledPFB(64, "hamming", 4, 4 / 3)
+        self.assertEqual(instance.hop, 48)
+        with self.assertRaises(ValueError):
+            OversampledPFB(64, "hamming", 4, 3)
+
+    def test_unit_oversampling_matches_pfb(self):
+        rng = np.random.default_rng(3)
+        frames = (rng.standard_normal((6, 64))
+                  + 1j * rng.standard_normal((6, 64))).astype(np.complex64)
+
+        pfb = PFB(64, "hamming", 4)
+        expected = np.empty_like(frames)
+        pfb.work([frames], [expected])
+
+        block = OversampledPFB(64, "hamming", 4, 1)
+        out = np.empty_like(frames)
+        self.assertEqual(block.general_work([frames], [out]), 6)
+        np.testing.assert_allclose(out, expected, rtol=1e-6, atol=1e-6)
+
+    def test_oversampled_tone_phase(self):
+        vec_len, num_taps, tone_bin = 64, 4, 5
+        samples = np.exp(2j * np.pi * tone_bin * np.arange(12 * vec_len) / vec_len)
+        frames = samples.astype(np.complex64).reshape(12, vec_len)
+
+        for oversampling, hop in ((2, 32), (4 / 3, 48)):
+            block = OversampledPFB(vec_len, "hamming", num_taps, oversampling)
+            out = np.empty((32, vec_len), dtype=np.complex64)
+            # Feed the stream in two chunks to exercise the carried-over state
+            produced = block.general_work([frames[:5]], [out])
+            produced += block.general_work([frames[5:]], [out[produced:]])
+            # The history starts with (num_taps - 1) zero frames, as in PFB
+            self.assertEqual(produced, (12 - 1) * vec_len // hop + 1)
+
+            # Once the history is full, the tone bin is identical in every output frame
+            spectrum = np.fft.fft(out[:produced], axis=1)[:, tone_bin]
+            steady = spectrum[-(-(num_taps - 1) * vec_len // hop):]
+            np.testing.assert_allclose(steady, steady[0], rtol=1e-4, atol=1e-3)
+
+    def test_small_output_buffer(self):
+        vec_len, num_taps = 64, 4
+        rng = np.random.default_rng(5)
+        frames = (rng.standard_normal((12, vec_len))
+                  + 1j * rng.standard_normal((12, vec_len))).astype(np.complex64)
+
+        for oversampling, hop in ((2, 32), (4 / 3, 48)):
+            reference = OversampledPFB(vec_len, "hamming", num_taps, oversampling)
+            expected = np.empty((32, vec_len), dtype=np.complex64)
+            total = reference.general_work([frames], [expected])
+
+            # Smallest output buffer the scheduler may give (one output multiple)
+            block = RecordingOversampledPFB(vec_len, "hamming", num_taps, oversampling)
+            multiple = block.output_multiple()
+            self.assertEqual(multiple, -(-vec_len // hop))
+            out = np.empty((total, vec_len), dtype=np.complex64)
+            read = produced = 0
+            while read < len(frames):
+                produced += block.general_work([frames[read:]], [out[produced:produced + multiple]])
+                self.assertGreater(block.consumed, 0)
+                read += block.consumed
+            self.assertEqual(produced, total)
+            np.testing.assert_allclose(out, expected[:total], rtol=1e-6, atol=1e-6)
+
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_OversampledPFB)
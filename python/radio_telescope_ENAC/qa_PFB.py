@@ -6,9 +6,12 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 #
 
+import numpy as np
 from gnuradio import gr, gr_unittest
 # from gnuradio import blocks
 from gnuradio.radio_telescope_ENAC import PFB
+from gnuradio.radio_telescope_ENAC import filter_design
+from gnuradio.radio_telescope_ENAC.polyphase import clear_tap_bank_cache, tap_bank
 
 class qa_PFB(gr_unittest.TestCase):
 
@@ -19,8 +22,89 @@ class qa_PFB(gr_unittest.TestCase):
         self.tb = None
 
     def test_instance(self):
-        # FIXME: Test will fail until you pass sensible arguments to the constructor
-        instance = PFB()
+        instance = PFB(64, "hamming", 4)
+        self.assertEqual(instance.filter.shape, (4 * 64,))
+
+    def test_batched_matches_per_frame(self):
+        vec_len, num_taps = 64, 4
+        rng = np.random.default_rng(0)
+        frames = (rng.standard_normal((10, vec_len))
+                  + 1j * rng.standard_normal((10, vec_len))).astype(np.complex64)
+
+        # Reference: one frame at a time in double precision, newest frame first in memory
+        taps = PFB(vec_len, "hamming", num_taps, "float64").filter.reshape(num_taps, vec_len)
+        memory = [np.zeros(vec_len)] * num_taps
+        expected = np.zeros(frames.shape, dtype=np.complex128)
+        for n, frame in enumerate(frames):
+            memory = [frame] + memory[:-1]
+            for phase in range(num_taps):
+                expected[n] += memory[phase] * taps[phase]
+
+        for precision, tolerance in (("float32", 1e-5), ("float64", 1e-7)):
+            pfb = PFB(vec_len, "hamming", num_taps, precision)
+            out = np.empty_like(frames)
+            # Split the stream over two work calls to exercise the history buffer
+            pfb.work([frames[:3]], [out[:3]])
+            pfb.work([frames[3:]], [out[3:]])
+            np.testing.assert_allclose(out, expected, rtol=tolerance, atol=tolerance)
+
+    def test_single_precision_storage(self):
+        pfb = PFB(64, "hamming", 4)
+        self.assertEqual(pfb.filter.dtype, np.float32)
+        self.assertEqual(pfb.engine.history.dtype, np.complex64)
+
+    def test_tap_bank_cache(self):
+        first = PFB(64, "hamming", 8)
+        second = PFB(64, "hamming", 8)
+
+        # Both instances share the same read-only (num_taps, vec_len) bank
+        self.assertIs(first.engine.taps, second.engine.taps)
+        self.assertIs(first.engine.taps, tap_bank(64, 8, "hamming"))
+        self.assertEqual(first.engine.taps.shape, (8, 64))
+        self.assertFalse(first.engine.taps.flags.writeable)
+
+    def test_window_hot_swap(self):
+        vec_len, num_taps = 64, 8
+        pfb = PFB(vec_len, "hamming", num_taps)
+        frames = np.ones((4, vec_len), dtype=np.complex64)
+        out = np.empty_like(frames)
+
+        pfb.set_window_type("blackman_harris")
+        pfb.engine.wait()
+        # The new bank is only staged until the next frame boundary
+        self.assertIs(pfb.engine.taps, tap_bank(vec_len, num_taps, "hamming"))
+
+        pfb.work([frames], [out])
+        self.assertIs(pfb.engine.taps, tap_bank(vec_len, num_taps, "blackman_harris"))
+        self.assertEqual(pfb.filter.shape, (num_taps * vec_len,))
+
+        # Only the most recent request is applied
+        pfb.set_window_type("hanning")
+        pfb.set_window_type("hamming")
+        pfb.engine.wait()
+        pfb.work([frames], [out])
+        self.assertIs(pfb.engine.taps, tap_bank(vec_len, num_taps, "hamming"))
+
+    def test_filter_design(self):
+        # Taps do not need to divide vec_len
+        pfb = PFB(100, ("kaiser", 10.0), 3)
+        self.assertEqual(pfb.filter.shape, (300,))
+
+        _, hamming = filter_design.design(256, 8, "hamming")
+        _, kaiser = filter_design.design(256, 8, ("kaiser", 12.0))
+        self.assertGreater(kaiser["stopband_attenuation_db"], hamming["stopband_attenuation_db"])
+        self.assertGreater(hamming["passband_ripple_db"], 0)
+
+        # A user prototype can be used like any other window
+        x = np.linspace(-2, 2, 4 * 64, endpoint=False)
+        filter_design.register_prototype("custom_hamming", np.sinc(x) * np.hamming(4 * 64))
+        # Registered for this test only, with the tap banks built from it
+        self.addCleanup(clear_tap_bank_cache)
+        self.addCleanup(filter_design.custom_prototypes.pop, "custom_hamming", None)
+        pfb = PFB(64, "custom_hamming", 4)
+        np.testing.assert_allclose(pfb.filter, tap_bank(64, 4, "hamming").reshape(-1), rtol=1e-6)
+        with self.assertRaises(ValueError):
+            PFB(32, "custom_hamming", 4)
 
     def test_001_descriptive_test_name(self):
         # set up fg
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 Mathias Huyghe.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import numpy as np
+from gnuradio import gr, gr_unittest
+from gnuradio.radio_telescope_ENAC import PFB, Spectrometer
+
+
+class qa_Spectrometer(gr_unittest.TestCase):
+
+    def setUp(self):
+        self.tb = gr.top_block()
+
+    def tearDown(self):
+        self.tb = None
+
+    def test_instance(self):
+        instance = Spectrometer(64, "hamming", 4, 16)
+        self.assertEqual(instance.nb_accumulation, 16)
+
+    def test_matches_block_chain(self):
+        vec_len, num_taps, nb_accumulation = 64, 4, 4
+        rng = np.random.default_rng(1)
+        frames = (rng.standard_normal((3 * nb_accumulation, vec_len))
+                  + 1j * rng.standard_normal((3 * nb_accumulation, vec_len))).astype(np.complex64)
+
+        spectrometer = Spectrometer(vec_len, "hamming", num_taps, nb_accumulation)
+        out = np.empty((3, vec_len), dtype=np.float32)
+        spectrometer.work([frames], [out])
+
+        # Reference: PFB -> fft (shifted) -> 1/vec_len -> |X|^2 -> integrate
+        pfb = PFB(vec_len, "hamming", num_taps)
+        filtered = np.empty_like(frames)
+        pfb.work([frames], [filtered])
+        spectrum = np.fft.fftshift(np.fft.fft(filtered, axis=1), axes=1) / vec_len
+        power = np.abs(spectrum) ** 2
+        expected = power.reshape(3, nb_accumulation, vec_len).sum(axis=1)
+
+        np.testing.assert_allclose(out, expected, rtol=1e-4)
+
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_Spectrometer)
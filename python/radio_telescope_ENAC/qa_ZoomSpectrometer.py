@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2025 Mathias Huyghe.
+#
+# SPDX-License-Identifier: GPL-3.0-or-later
+#
+
+import numpy as np
+from gnuradio import gr, gr_unittest
+from gnuradio.radio_telescope_ENAC import PFB, ZoomSpectrometer
+
+
+class qa_ZoomSpectrometer(gr_unittest.TestCase):
+
+    def setUp(self):
+        self.tb = gr.top_block()
+
+    def tearDown(self):
+        self.tb = None
+
+    def test_instance(self):
+        instance = ZoomSpectrometer(64, "hamming", 4, 10, 4, 8, 2)
+        self.assertEqual(len(instance.channels), 4)
+        with self.assertRaises(ValueError):
+            ZoomSpectrometer(64, "hamming", 4, 62, 4, 8, 2)
+
+    def test_channel_range(self):
+        first, count = ZoomSpectrometer.channel_range(4096, 2.5e6, 1420e6, 1419.9e6, 1420.1e6)
+        freq = 1420e6 + np.fft.fftshift(np.fft.fftfreq(4096, 1 / 2.5e6))
+        self.assertTrue(np.all((freq[first:first + count] > 1419.9e6) & (freq[first:first + count] < 1420.1e6)))
+        self.assertEqual(count, np.sum((freq > 1419.9e6) & (freq < 1420.1e6)))
+
+    def test_matches_reference(self):
+        vec_len, num_taps, first, count, zoom_len, nb_accumulation = 64, 4, 20, 3, 8, 2
+        rng = np.random.default_rng(4)
+        num_frames = 2 * zoom_len * nb_accumulation
+        frames = (rng.standard_normal((num_frames, vec_len))
+                  + 1j * rng.standard_normal((num_frames, vec_len))).astype(np.complex64)
+
+        pfb = PFB(vec_len, "hamming", num_taps)
+        filtered = np.empty_like(frames)
+        pfb.work([frames], [filtered])
+        coarse = np.fft.fftshift(np.fft.fft(filtered, axis=1), axes=1)[:, first:first + count] / vec_len
+        expected_outputs = []
+        for n in range(2):
+            expected = np.zeros((count, zoom_len))
+            for z in range(nb_accumulation):
+                start = (n * nb_accumulation + z) * zoom_len
+                segment = coarse[start:start + zoom_len]
+                expected += np.abs(np.fft.fftshift(np.fft.fft(segment, axis=0), axes=0).T / zoom_len) ** 2
+            expected_outputs.append(expected.reshape(-1))
+
+        # Both FFTs run on the configured backend
+        for backend in ("numpy", "scipy"):
+            block = ZoomSpectrometer(vec_len, "hamming", num_taps, first, count, zoom_len, nb_accumulation,
+                                     "float32", backend, 2)
+            self.assertEqual(block.fine_fft.backend, backend)
+            out = np.empty((2, count * zoom_len), dtype=np.float32)
+            self.assertEqual(block.work([frames], [out]), 2)
+            np.testing.assert_allclose(out, expected_outputs, rtol=1e-4)
+
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_ZoomSpectrometer)